@@ -0,0 +1,56 @@
+"""
+Stored performance baselines shared by the benchmark scripts.
+
+Baselines live in benchmarks/baseline.json, keyed by benchmark name. Each
+metric is compared in the direction given by ``higher_is_better`` and a
+regression beyond the tolerance fails the run.
+"""
+import os
+import json
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def load_baselines(path=BASELINE_FILE):
+    """Load all stored baselines"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def update_baseline(name, metrics, path=BASELINE_FILE):
+    """Store ``metrics`` as the baseline for benchmark ``name``"""
+    baselines = load_baselines(path)
+    baselines[name] = metrics
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare_to_baseline(name, metrics, higher_is_better, tolerance=0.2, path=BASELINE_FILE):
+    """
+    Compare metrics against the stored baseline.
+
+    Args:
+        name (str): Benchmark name
+        metrics (dict): Current metric values
+        higher_is_better (dict): Direction of each metric to check
+        tolerance (float): Allowed relative regression (0.2 = 20%)
+
+    Returns:
+        list: Human-readable descriptions of regressed metrics
+    """
+    baseline = load_baselines(path).get(name)
+    if not baseline:
+        return []
+
+    regressions = []
+    for metric, higher in higher_is_better.items():
+        if metric not in baseline or metric not in metrics or not baseline[metric]:
+            continue
+        old, new = baseline[metric], metrics[metric]
+        change = (new - old) / old
+        if (higher and change < -tolerance) or (not higher and change > tolerance):
+            regressions.append(f"{metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
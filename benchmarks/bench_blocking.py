@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Compare blocked and unblocked product matching.
+
+Reports pairwise precision/recall of both matchers on the labelled fixture
+set and the share of the unblocked matcher's pairs that blocking keeps,
+then times both on a larger synthetic corpus.
+
+Usage:
+    python benchmarks/bench_blocking.py [--threshold 0.7] [--scale 100000]
+"""
+import os
+import sys
+import time
+import argparse
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from bench_normalizer import synthetic_titles
+from electronics_scraper.utils.normalizer import Normalizer
+from electronics_scraper.utils.matcher import find_similar_groups, find_blocked_groups
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'labelled_products.csv')
+
+
+def group_labels(groups, size):
+    """Label each position with its group, giving ungrouped positions their own label."""
+    labels = np.arange(size) + size
+    for label, group in enumerate(groups):
+        labels[group] = label
+    return labels
+
+
+def pair_count(*labellings):
+    """Number of unordered position pairs sharing a label in every labelling."""
+    _, counts = np.unique(np.stack(labellings, axis=1), axis=0, return_counts=True)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold', type=float, default=0.7, help="Similarity threshold")
+    parser.add_argument('--scale', type=int, default=100000, help="Synthetic corpus size for timing")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size for blocking")
+    args = parser.parse_args()
+
+    normalizer = Normalizer()
+    labelled = pd.read_csv(FIXTURE)
+    names = normalizer.normalize_series(labelled['name']).tolist()
+    size = len(names)
+    truth = group_labels(list(labelled.groupby('label').indices.values()), size)
+
+    unblocked = group_labels(find_similar_groups(names, args.threshold), size)
+    blocked = group_labels(find_blocked_groups(names, args.threshold, max_workers=args.workers), size)
+
+    print(f"Labelled fixture: {size} listings, {pair_count(truth)} true pairs")
+    for label, labels in [('unblocked', unblocked), ('blocked', blocked)]:
+        correct = pair_count(labels, truth)
+        print(f"  {label:<10} precision {ratio(correct, pair_count(labels)):.3f}  "
+              f"recall {ratio(correct, pair_count(truth)):.3f}")
+    print(f"  blocked keeps {ratio(pair_count(blocked, unblocked), pair_count(unblocked)):.3f} "
+          f"of unblocked pairs")
+
+    if args.scale:
+        titles = pd.Series(synthetic_titles(args.scale, unique_ratio=0.5), dtype=object)
+        names = normalizer.normalize_series(titles).tolist()
+
+        start = time.perf_counter()
+        find_similar_groups(names, args.threshold)
+        unblocked_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        find_blocked_groups(names, args.threshold, max_workers=args.workers)
+        blocked_time = time.perf_counter() - start
+
+        print(f"Synthetic corpus: {len(names)} listings")
+        print(f"  unblocked {unblocked_time:8.2f}s  blocked {blocked_time:8.2f}s  "
+              f"speedup {ratio(unblocked_time, blocked_time):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
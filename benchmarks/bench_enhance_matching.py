@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Benchmark enhance_product_matching from 1k to 500k rows.
+
+Listings are synthetic, with heavy name repetition across sites like a
+real pooled crawl. The original boolean-mask implementation is timed too,
+up to --reference-max rows, since it scales as O(n*m).
+
+Usage:
+    python benchmarks/bench_enhance_matching.py [--sizes 1000,10000,100000,500000]
+"""
+import os
+import sys
+import time
+import argparse
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench_normalizer import synthetic_titles
+from electronics_scraper.utils.normalizer import Normalizer
+from electronics_scraper.utils.matcher import (
+    enhance_product_matching, find_exact_matches, group_similar_products
+)
+
+WEBSITES = ['BobShop', 'Revibe', 'iStore', 'Gorilla Phones', 'BackMarket']
+
+
+def reference_enhance_product_matching(df):
+    """The original implementation, with a name lookup per exact-match item."""
+    exact_matches = find_exact_matches(df, ['normalized_name'])
+
+    used_indices = set()
+    for group in exact_matches:
+        for item in group:
+            idx = df[df['name'] == item['name']].index
+            if not idx.empty:
+                used_indices.add(idx[0])
+
+    remaining_df = df.drop(list(used_indices))
+    return exact_matches + group_similar_products(remaining_df)
+
+
+def synthetic_listings(size):
+    titles = synthetic_titles(size, unique_ratio=0.05)
+    df = pd.DataFrame({
+        'name': titles,
+        'website': [WEBSITES[i % len(WEBSITES)] for i in range(size)],
+        'price': [1000.0 + i % 500 for i in range(size)],
+    })
+    df['normalized_name'] = Normalizer().normalize_series(df['name'])
+    return df
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    groups = func(df)
+    return time.perf_counter() - start, len(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000,500000',
+                        help="Comma-separated row counts")
+    parser.add_argument('--reference-max', type=int, default=20000,
+                        help="Largest size to time the original implementation on")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'indexed':>10} {'groups':>8} {'original':>10}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        df = synthetic_listings(size)
+        elapsed, groups = timed(enhance_product_matching, df)
+
+        reference = '-'
+        if size <= args.reference_max:
+            reference = f"{timed(reference_enhance_product_matching, df)[0]:9.2f}s"
+
+        print(f"{size:>8} {elapsed:9.2f}s {groups:>8} {reference:>10}")
+
+
+if __name__ == "__main__":
+    main()
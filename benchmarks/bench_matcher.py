@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Benchmark group_similar_products on synthetic listings of increasing size.
+
+Reports wall-clock time, peak RSS and the number of groups found for
+each corpus size.
+
+Usage:
+    python benchmarks/bench_matcher.py [--sizes 1000,10000,50000,200000]
+"""
+import os
+import sys
+import time
+import resource
+import argparse
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench_normalizer import synthetic_titles
+from electronics_scraper.utils.normalizer import Normalizer
+from electronics_scraper.utils.matcher import group_similar_products
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,50000,200000',
+                        help="Comma-separated corpus sizes")
+    parser.add_argument('--threshold', type=float, default=0.7, help="Similarity threshold")
+    args = parser.parse_args()
+
+    normalizer = Normalizer()
+    for size in [int(s) for s in args.sizes.split(',')]:
+        titles = pd.Series(synthetic_titles(size, unique_ratio=0.5), dtype=object)
+        df = pd.DataFrame({'normalized_name': normalizer.normalize_series(titles)})
+
+        start = time.perf_counter()
+        groups = group_similar_products(df, similarity_threshold=args.threshold)
+        elapsed = time.perf_counter() - start
+
+        print(f"{size:>8} listings  {elapsed:8.2f}s  {len(groups):>6} groups  "
+              f"peak RSS {peak_rss_mb():8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
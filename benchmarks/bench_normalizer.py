@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Benchmark the Normalizer against the original normalize_product_name.
+
+Generates synthetic product titles, checks that every normalizer path
+produces byte-identical output to the reference implementation and
+reports the time taken by each.
+
+Usage:
+    python benchmarks/bench_normalizer.py [--count 100000]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electronics_scraper.utils.normalizer import Normalizer
+
+
+def reference_normalize_product_name(name):
+    """The original, uncompiled implementation of normalize_product_name."""
+    if not isinstance(name, str):
+        return ""
+
+    name = name.lower()
+
+    stopwords = ['new', 'used', 'refurbished', 'like', 'condition', 'grade', 'certified']
+    for word in stopwords:
+        name = re.sub(r'\b' + word + r'\b', '', name)
+
+    name = re.sub(r'\s+', ' ', name).strip()
+
+    patterns = {
+        r'iphone\s*(\d+)\s*(pro)?\s*(max)?': r'iphone \1 \2 \3',
+        r'iphone\s*(\d+)\s*(plus)': r'iphone \1 plus',
+        r'iphone\s*(\d+)\s*(mini)': r'iphone \1 mini',
+        r'galaxy\s*s(\d+)': r'galaxy s\1',
+        r'galaxy\s*note\s*(\d+)': r'galaxy note \1',
+        r'galaxy\s*a(\d+)': r'galaxy a\1',
+        r'airpods\s*(pro)?\s*(gen|generation)?\s*(\d+)?': r'airpods \1 \3',
+        r'macbook\s*(pro|air)?\s*(\d+)?"?': r'macbook \1 \2"',
+        r'apple\s*watch\s*(series)?\s*(\d+)': r'apple watch series \2',
+        r'ipad\s*(pro|air|mini)?\s*(\d+)?': r'ipad \1 \2',
+        r'(\d+)\s*gb': r'\1gb',
+        r'(\d+)\s*tb': r'\1tb',
+        r'(black|white|gold|silver|gray|grey|blue|red|green|yellow|purple)': r'\1'
+    }
+
+    for pattern, replacement in patterns.items():
+        name = re.sub(pattern, replacement, name)
+
+    name = re.sub(r'[^\w\s]', ' ', name)
+    name = re.sub(r'\s+', ' ', name).strip()
+
+    return name
+
+
+MODELS = [
+    'Apple iPhone {n}', 'iPhone {n} Pro Max', 'iPhone{n}Pro', 'iPhone {n} Plus', 'iPhone {n} mini',
+    'Samsung Galaxy S{n}', 'Galaxy Note{n}', 'Samsung Galaxy A{n}', 'AirPods Pro Gen {m}',
+    'Apple MacBook Air {n}"', 'MacBook Pro', 'Apple Watch Series {m}', 'iPad Pro {n}',
+    'iPad mini', 'Google Pixel {m}', 'PlayStation {m} Console',
+]
+CONDITIONS = ['', 'New', 'Used', 'Refurbished', 'Like New', 'Grade A', 'Certified Pre-Owned',
+              '(Excellent Condition)', 'Used - Good']
+STORAGE = ['', '64GB', '128 GB', '256gb', '512 GB', '1TB', '1 TB']
+COLORS = ['', 'Black', 'White', 'Gold', 'Silver', 'Space Grey', 'Blue', 'Midnight', 'Purple']
+
+
+def synthetic_titles(count, unique_ratio=0.2, seed=42):
+    """
+    Build ``count`` titles of which roughly ``unique_ratio`` are distinct.
+    """
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(max(1, int(count * unique_ratio))):
+        title = ' '.join(part for part in [
+            rng.choice(CONDITIONS),
+            rng.choice(MODELS).format(n=rng.randint(6, 16), m=rng.randint(1, 9)),
+            rng.choice(STORAGE),
+            rng.choice(COLORS),
+            rng.choice(['', '-', '|', '(Dual SIM)', '5G', 'Wi-Fi + Cellular']),
+        ] if part)
+        pool.append(title)
+    titles = [rng.choice(pool) for _ in range(count)]
+    # Sprinkle in values the normalizer must tolerate
+    titles[::997] = [None] * len(titles[::997])
+    return titles
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000, help="Number of synthetic titles")
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.count)
+    print(f"{len(titles)} titles, {len(set(titles))} unique")
+
+    expected = timed("reference", lambda: [reference_normalize_product_name(t) for t in titles])
+
+    normalizer = Normalizer()
+    cold = timed("Normalizer.normalize (cold)", lambda: [normalizer.normalize(t) for t in titles])
+    warm = timed("Normalizer.normalize (warm)", lambda: [normalizer.normalize(t) for t in titles])
+    print(f"cache: {normalizer.cache_info()}")
+
+    failures = 0
+    for label, result in [('cold', cold), ('warm', warm)]:
+        mismatches = [(t, e, r) for t, e, r in zip(titles, expected, result) if e != r]
+        if mismatches:
+            failures += 1
+            print(f"MISMATCH ({label}): {len(mismatches)} titles, e.g. {mismatches[0]!r}")
+
+    try:
+        import pandas as pd
+    except ImportError:
+        print("pandas not installed, skipping normalize_series")
+    else:
+        series = pd.Series(titles, dtype=object)
+        vectorized = timed("Normalizer.normalize_series", Normalizer().normalize_series, series)
+        if vectorized.tolist() != expected:
+            failures += 1
+            print("MISMATCH (normalize_series)")
+
+    if failures:
+        sys.exit(1)
+    print("All outputs byte-identical to the reference implementation")
+
+
+if __name__ == "__main__":
+    main()
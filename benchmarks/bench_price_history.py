@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark the SQLite price history store with millions of observations.
+
+Simulates repeated crawls of a synthetic catalog where a fraction of the
+prices change between runs, then times the query API.
+
+Usage:
+    python benchmarks/bench_price_history.py [--products 50000 --runs 40 --change-rate 0.5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench_normalizer import synthetic_titles
+from electronics_scraper.utils.normalizer import Normalizer
+from electronics_scraper.utils.price_history import PriceHistoryStore
+
+WEBSITES = ['BobShop', 'Revibe', 'iStore', 'Gorilla Phones', 'BackMarket']
+
+
+def synthetic_catalog(size, seed=0):
+    titles = synthetic_titles(size, unique_ratio=0.2, seed=seed)
+    normalized = Normalizer().normalize_series(pd.Series(titles))
+    rng = random.Random(seed)
+    return [{
+        'name': title,
+        'normalized_name': normalized_name,
+        'website': WEBSITES[i % len(WEBSITES)],
+        'url': f"https://example.com/{WEBSITES[i % len(WEBSITES)]}/products/{i}",
+        'currency': 'ZAR',
+        'price': float(rng.randrange(1000, 30000)),
+    } for i, (title, normalized_name) in enumerate(zip(titles, normalized))]
+
+
+def timed_query(func, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=50000, help="Listings in the catalog")
+    parser.add_argument('--runs', type=int, default=40, help="Simulated crawls")
+    parser.add_argument('--change-rate', type=float, default=0.5, help="Fraction of prices changing per run")
+    parser.add_argument('--batch-size', type=int, default=500, help="Items per pipeline flush")
+    parser.add_argument('--db', help="Database file (default: a temporary file)")
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.products)
+    rng = random.Random(1)
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'price_history.sqlite')
+    store = PriceHistoryStore(path)
+
+    start_time = datetime(2025, 1, 1)
+    write_seconds = 0.0
+    changes = 0
+    for run in range(args.runs):
+        timestamp = (start_time + timedelta(hours=6 * run)).isoformat()
+        for item in catalog:
+            if run and rng.random() < args.change_rate:
+                item['price'] = round(item['price'] * rng.uniform(0.9, 1.1))
+            item['price_zar'] = item['price']
+            item['timestamp'] = timestamp
+
+        start = time.perf_counter()
+        for offset in range(0, len(catalog), args.batch_size):
+            changes += store.write_batch(catalog[offset:offset + args.batch_size])
+        write_seconds += time.perf_counter() - start
+
+    items = args.products * args.runs
+    print(f"{items:,} items written in {write_seconds:.1f}s ({items / write_seconds:,.0f} items/s), "
+          f"{changes:,} observations, {os.path.getsize(path) / 1e6:.0f} MB")
+
+    sample = rng.choice(catalog)
+    week_ago = (start_time + timedelta(hours=6 * args.runs) - timedelta(days=7)).isoformat()
+    queries = {
+        'latest_prices(normalized_name)': lambda: store.latest_prices(normalized_name=sample['normalized_name']),
+        'latest_prices(website, limit=100)': lambda: store.latest_prices(website=sample['website'], limit=100),
+        'product_history(website, url)': lambda: store.product_history(sample['website'], sample['url']),
+        'history(normalized_name, since=7d)': lambda: store.history(sample['normalized_name'], since=week_ago),
+        'history(normalized_name)': lambda: store.history(sample['normalized_name']),
+    }
+    print(f"{'query':>36} {'ms':>8} {'rows':>6}")
+    for label, query in queries.items():
+        ms, rows = timed_query(query)
+        print(f"{label:>36} {ms:>8.3f} {rows:>6}")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
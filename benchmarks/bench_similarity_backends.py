@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Compare the MinHash-LSH similarity backend with the TF-IDF backend.
+
+For each corpus size, reports the throughput of both backends, the
+number of candidate pairs LSH verifies, and its pairwise recall and
+precision against the TF-IDF groups. Pairs are counted between
+listings, as in bench_blocking.py.
+
+Usage:
+    python benchmarks/bench_similarity_backends.py [--sizes 10000,100000,300000 --bands 32]
+"""
+import os
+import sys
+import time
+import argparse
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench_normalizer import synthetic_titles
+from bench_blocking import group_labels, pair_count, ratio
+from electronics_scraper.utils.normalizer import Normalizer
+from electronics_scraper.utils.matcher import TfidfBackend, MinHashLSHBackend, _vectorize_names
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,300000', help="Comma-separated corpus sizes")
+    parser.add_argument('--threshold', type=float, default=0.7, help="Similarity threshold")
+    parser.add_argument('--unique-ratio', type=float, default=0.5, help="Share of distinct titles")
+    parser.add_argument('--num-perm', type=int, default=128, help="MinHash signature length")
+    parser.add_argument('--bands', type=int, default=32, help="LSH bands")
+    parser.add_argument('--shingle-size', type=int, default=3, help="Characters per shingle")
+    args = parser.parse_args()
+
+    normalizer = Normalizer()
+    tfidf = TfidfBackend()
+    minhash = MinHashLSHBackend(num_perm=args.num_perm, bands=args.bands, shingle_size=args.shingle_size)
+
+    print(f"{'listings':>9} {'tfidf s':>8} {'rows/s':>9} {'minhash s':>10} {'rows/s':>9} "
+          f"{'candidates':>11} {'recall':>7} {'precision':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        titles = pd.Series(synthetic_titles(size, unique_ratio=args.unique_ratio), dtype=object)
+        names = normalizer.normalize_series(titles).tolist()
+
+        tfidf_time, tfidf_groups = timed(tfidf.find_groups, names, args.threshold)
+        minhash_time, minhash_groups = timed(minhash.find_groups, names, args.threshold)
+
+        # Candidate count, outside the timings
+        _, distinct_names, tfidf_matrix = _vectorize_names(names)
+        signatures, has_shingles = minhash.signatures(distinct_names)
+        candidates, _ = minhash.candidate_pairs(signatures, has_shingles, tfidf_matrix, args.threshold)
+
+        reference = group_labels(tfidf_groups, size)
+        labels = group_labels(minhash_groups, size)
+        shared = pair_count(labels, reference)
+        print(f"{size:>9} {tfidf_time:>8.2f} {size / tfidf_time:>9,.0f} {minhash_time:>10.2f} "
+              f"{size / minhash_time:>9,.0f} {len(candidates):>11,} "
+              f"{ratio(shared, pair_count(reference)):>7.3f} {ratio(shared, pair_count(labels)):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Benchmark cold-start import time of a single-spider crawl.
+
+Imports what Scrapy loads before the first request: the project settings,
+every project component they enable (pipelines, middlewares, extensions,
+HTTP cache) and one spider. Each run is a fresh ``python -X importtime``
+process. The script reports the median import time, the slowest
+project modules, and which heavy analytics modules were loaded. It fails
+if the results regress against the stored baseline.
+
+Usage:
+    python benchmarks/bench_startup.py [--spider bobshop] [--repeat 7] [--update-baseline]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+# Ensure the project's directory is in the Python path
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from scrapy.utils.project import get_project_settings
+
+from baseline import compare_to_baseline, update_baseline
+from electronics_scraper.runner import SPIDERS
+
+# Modules that should only load once matching or analytics actually run
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'sklearn', 'pyarrow', 'requests')
+
+# Metrics checked against the baseline, and whether higher is better
+CHECKED_METRICS = {
+    'import_ms': False,
+    'project_import_ms': False,
+    'wall_ms': False,
+}
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def startup_modules(spider):
+    """Project modules Scrapy imports to start crawling ``spider``"""
+    settings = get_project_settings()
+    paths = [SPIDERS[spider]]
+    for name in ('ITEM_PIPELINES', 'DOWNLOADER_MIDDLEWARES', 'SPIDER_MIDDLEWARES', 'EXTENSIONS'):
+        paths.extend(path for path, order in settings.getdict(name).items() if order is not None)
+    paths.extend(settings.get(name) for name in ('HTTPCACHE_STORAGE', 'HTTPCACHE_POLICY', 'DUPEFILTER_CLASS'))
+    modules = {path.rsplit('.', 1)[0] for path in paths if isinstance(path, str)}
+    return sorted(module for module in modules if module.startswith('electronics_scraper.'))
+
+
+def measure(modules):
+    """
+    Import the modules in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (wall ms, {module: (self us, cumulative us, depth)})
+    """
+    code = '; '.join(['import scrapy.crawler', 'import electronics_scraper.settings']
+                     + [f'import {module}' for module in modules])
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings[module] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return wall_ms, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--spider', default='bobshop', choices=sorted(SPIDERS), help="Spider to start")
+    parser.add_argument('--repeat', type=int, default=7, help="Interpreter launches to take the median of")
+    parser.add_argument('--top', type=int, default=10, help="Slowest project modules to list")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed regression (0.2 = 20%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the baseline")
+    args = parser.parse_args()
+
+    modules = startup_modules(args.spider)
+    runs = [measure(modules) for _ in range(args.repeat)]
+    timings = runs[-1][1]
+
+    def top_level_ms(timings, prefix=''):
+        return sum(cumulative for module, (_, cumulative, depth) in timings.items()
+                   if depth == 0 and module.startswith(prefix)) / 1000
+
+    metrics = {
+        'import_ms': statistics.median(top_level_ms(run_timings) for _, run_timings in runs),
+        'project_import_ms': statistics.median(top_level_ms(run_timings, 'electronics_scraper')
+                                               for _, run_timings in runs),
+        'wall_ms': statistics.median(wall_ms for wall_ms, _ in runs),
+    }
+    heavy = sorted(module for module in HEAVY_MODULES if module in timings)
+
+    print(f"Startup imports for {args.spider}: {', '.join(modules)}")
+    print(f"  interpreter wall   {metrics['wall_ms']:8.1f} ms")
+    print(f"  all imports        {metrics['import_ms']:8.1f} ms")
+    print(f"  project imports    {metrics['project_import_ms']:8.1f} ms")
+    print(f"  heavy modules      {', '.join(heavy) or 'none'}")
+    print(f"  {'slowest project modules':<48} {'self ms':>8} {'cumul ms':>9}")
+    project = sorted(((module, timing) for module, timing in timings.items()
+                      if module.startswith('electronics_scraper')), key=lambda entry: -entry[1][1])
+    for module, (self_us, cumulative_us, _) in project[:args.top]:
+        print(f"  {module:<48} {self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}")
+
+    benchmark = f"startup:{args.spider}"
+    if args.update_baseline:
+        update_baseline(benchmark, metrics)
+        print(f"Stored baseline for {benchmark}")
+        return
+
+    regressions = compare_to_baseline(benchmark, metrics, CHECKED_METRICS, args.tolerance)
+    if regressions:
+        print("PERFORMANCE REGRESSION:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""
+Replay recorded responses through the spiders and the processing pipeline.
+
+Fixtures are recorded from real crawls with the FixtureRecorderMiddleware:
+
+    scrapy crawl revibe -s FIXTURE_RECORD_DIR=benchmarks/fixtures/responses
+
+Each recorded response is fed through the callback that originally
+handled it (parse, parse_product, ...), every item it yields through
+DataProcessingPipeline, with no network access. The run reports pages/sec,
+items/sec, per-callback latency percentiles and peak RSS, and fails if
+they regress against the stored baseline.
+
+Usage:
+    python benchmarks/replay.py [--spiders revibe,bobshop] [--repeat 5] [--update-baseline]
+"""
+import os
+import sys
+import time
+import asyncio
+import inspect
+import logging
+import argparse
+import resource
+import tempfile
+
+# Ensure the project's directory is in the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapy import Request
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+try:
+    from scrapy.utils.misc import walk_modules_iter as walk_modules
+except ImportError:  # Older Scrapy releases
+    from scrapy.utils.misc import walk_modules
+from scrapy.utils.spider import iter_spider_classes
+
+from baseline import compare_to_baseline, update_baseline
+from electronics_scraper.pipelines import DataProcessingPipeline
+from electronics_scraper.utils.fixtures import FixtureStore
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'responses')
+
+# Metrics checked against the baseline, and whether higher is better
+CHECKED_METRICS = {
+    'pages_per_sec': True,
+    'items_per_sec': True,
+    'peak_rss_mb': False,
+}
+
+
+def spider_classes():
+    """All spiders in the project, by name"""
+    classes = {}
+    for module in walk_modules('electronics_scraper.spiders'):
+        for spider_class in iter_spider_classes(module):
+            classes[spider_class.name] = spider_class
+    return classes
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def build_response(entry, spider):
+    """Rebuild the request and response for a recorded entry"""
+    callback = getattr(spider, entry['callback'])
+    request = Request(url=entry['request_url'], callback=callback, meta=dict(entry['meta']))
+    headers = Headers({key: values for key, values in entry['headers'].items()})
+    response_class = responsetypes.from_args(headers=headers, url=entry['url'], body=entry['body'])
+    response = response_class(url=entry['url'], status=entry['status'], headers=headers,
+                              body=entry['body'], request=request)
+    return callback, response
+
+
+def drain(result, loop):
+    """Exhaust a callback's output, whether it is sync or async"""
+    if result is None:
+        return []
+    if inspect.isasyncgen(result):
+        async def collect():
+            return [output async for output in result]
+        return loop.run_until_complete(collect())
+    if inspect.iscoroutine(result):
+        return drain(loop.run_until_complete(result), loop)
+    return list(result)
+
+
+class ReplayRunner:
+    """Feeds fixture entries through spiders and the pipeline, collecting timings."""
+
+    def __init__(self, store, results_dir):
+        self.store = store
+        self.results_dir = results_dir
+        self.classes = spider_classes()
+        self.loop = asyncio.new_event_loop()
+        self.latencies = {}
+        self.pages = 0
+        self.items = 0
+        self.requests = 0
+
+    def timed(self, label, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+        return result
+
+    def run_spider(self, name, entries):
+        spider = self.classes[name]()
+        pipeline = DataProcessingPipeline(results_dir=self.results_dir, sinks=['jsonl'])
+        pipeline.open_spider(spider)
+
+        for entry in entries:
+            callback, response = build_response(entry, spider)
+            outputs = self.timed(f"{name}.{entry['callback']}",
+                                 lambda: drain(callback(response), self.loop))
+            self.pages += 1
+            for output in outputs:
+                if isinstance(output, Request):
+                    self.requests += 1
+                else:
+                    self.items += 1
+                    self.timed('pipeline.process_item', pipeline.process_item, output, spider)
+
+        self.timed('pipeline.close_spider', pipeline.close_spider, spider)
+
+    def close(self):
+        self.loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="Fixture store directory")
+    parser.add_argument('--spiders', help="Comma-separated spiders to replay (default: all recorded)")
+    parser.add_argument('--repeat', type=int, default=1, help="Replay the fixtures this many times")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed regression (0.2 = 20%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--log-level', default='WARNING', help="Log level while replaying")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    store = FixtureStore(args.fixtures)
+    names = args.spiders.split(',') if args.spiders else store.spiders()
+    if not names:
+        print(f"No fixtures in {args.fixtures}; record some with FIXTURE_RECORD_DIR first")
+        sys.exit(1)
+
+    fixtures = {name: list(store.load(name)) for name in names}
+
+    with tempfile.TemporaryDirectory() as results_dir:
+        runner = ReplayRunner(store, results_dir)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for name in names:
+                runner.run_spider(name, fixtures[name])
+        elapsed = time.perf_counter() - start
+        runner.close()
+
+    metrics = {
+        'pages_per_sec': runner.pages / elapsed,
+        'items_per_sec': runner.items / elapsed,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    print(f"Replayed {runner.pages} pages -> {runner.items} items, {runner.requests} requests "
+          f"in {elapsed:.2f}s")
+    print(f"  pages/sec {metrics['pages_per_sec']:10.1f}")
+    print(f"  items/sec {metrics['items_per_sec']:10.1f}")
+    print(f"  peak RSS  {metrics['peak_rss_mb']:10.1f} MB")
+    print(f"  {'callback':<32} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, values in sorted(runner.latencies.items()):
+        p50, p95, p99 = (percentile(values, q) * 1000 for q in (0.5, 0.95, 0.99))
+        print(f"  {label:<32} {len(values):>6} {p50:8.2f} {p95:8.2f} {p99:8.2f}")
+        metrics[f"{label}.p95_ms"] = p95
+
+    benchmark = f"replay:{','.join(names)}"
+    if args.update_baseline:
+        update_baseline(benchmark, metrics)
+        print(f"Stored baseline for {benchmark}")
+        return
+
+    checked = dict(CHECKED_METRICS, **{key: False for key in metrics if key.endswith('.p95_ms')})
+    regressions = compare_to_baseline(benchmark, metrics, checked, args.tolerance)
+    if regressions:
+        print("PERFORMANCE REGRESSION:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
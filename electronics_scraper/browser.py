@@ -0,0 +1,173 @@
+"""
+Browser-rendering support for spiders that need JavaScript.
+
+Only spiders that opt in with ``custom_settings = BROWSER_SETTINGS`` route
+requests through scrapy-playwright, and of those only requests flagged
+with ``playwright`` in their meta are rendered; the browser is launched on
+the first such request.
+"""
+import os
+import asyncio
+from urllib.parse import urlsplit
+
+# Resource types never needed to read product data
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Second-level labels used under country-code TLDs, e.g. co.za
+_SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'ac', 'gov'}
+
+BROWSER_SETTINGS = {
+    'DOWNLOAD_HANDLERS': {
+        'http': 'scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler',
+        'https': 'scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler',
+    },
+    'PLAYWRIGHT_ABORT_REQUEST': 'electronics_scraper.browser.should_abort_request',
+    'PLAYWRIGHT_MAX_CONTEXTS': 2,
+    'PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT': 30 * 1000,
+}
+
+
+def _site(host):
+    """Registrable part of a host name, e.g. statics.backmarket.com -> backmarket.com"""
+    labels = (host or '').lower().split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def should_abort_request(request):
+    """
+    Route rule for PLAYWRIGHT_ABORT_REQUEST.
+
+    Aborts images, media, fonts and scripts served from another site than
+    the page being rendered.
+
+    Args:
+        request (playwright.async_api.Request): Request made by the page
+
+    Returns:
+        bool: True if the request should be aborted
+    """
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    if request.resource_type == 'script':
+        try:
+            page_url = request.frame.page.url
+        except Exception:
+            # Service worker requests have no frame
+            return False
+        return _site(urlsplit(request.url).hostname) != _site(urlsplit(page_url).hostname)
+    return False
+
+
+def browser_meta(wait_for=None, context='default', timeout=15000, **meta):
+    """
+    Build the meta for a request rendered in the browser.
+
+    The page is considered ready once the DOM is parsed and, if given, the
+    ``wait_for`` selector is attached, instead of waiting for the full
+    ``load`` event.
+
+    Args:
+        wait_for (str): CSS selector to wait for before reading the page
+        context (str): Name of the browser context to render in
+        timeout (int): Milliseconds to wait for the selector
+        **meta: Extra meta keys
+
+    Returns:
+        dict: Request meta
+    """
+    page_methods = []
+    if wait_for:
+        from scrapy_playwright.page import PageMethod
+        page_methods.append(PageMethod('wait_for_selector', wait_for, state='attached', timeout=timeout))
+
+    return {
+        'playwright': True,
+        'playwright_context': context,
+        'playwright_page_goto_kwargs': {'wait_until': 'domcontentloaded'},
+        'playwright_page_methods': page_methods,
+        **meta,
+    }
+
+
+class PagePool:
+    """
+    Bounded pool of idle browser pages, per context.
+
+    Pages are handed out to the next rendered request instead of opening a
+    new page per request. Pages returned when the pool is full are closed.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = {}  # Context name -> idle pages
+
+    def acquire(self, context):
+        """Return an idle open page of the context, or None"""
+        pages = self.idle.get(context, [])
+        while pages:
+            page = pages.pop()
+            if not page.is_closed():
+                return page
+        return None
+
+    def release(self, context, page):
+        """Return a page to the pool, closing it if the pool is full"""
+        if page.is_closed():
+            return
+        pages = self.idle.setdefault(context, [])
+        if len(pages) < self.size:
+            pages.append(page)
+        else:
+            discard_page(page)
+
+    def clear(self):
+        """Close and forget every idle page"""
+        for pages in self.idle.values():
+            for page in pages:
+                discard_page(page)
+        self.idle = {}
+
+    def __len__(self):
+        return sum(len(pages) for pages in self.idle.values())
+
+
+def discard_page(page):
+    """Close a page without waiting for it"""
+    if not page.is_closed():
+        asyncio.ensure_future(page.close())
+
+
+def browser_rss():
+    """
+    Resident memory of the browser, in bytes.
+
+    Sums the RSS of every descendant process (Playwright driver and
+    browser processes). Returns None where /proc isn't available.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = {}
+    rss_pages = {}
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # The command name may contain spaces, so split after it
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{pid}/statm') as f:
+                rss_pages[int(pid)] = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(pid))
+
+    total = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf('SC_PAGE_SIZE')
@@ -0,0 +1,136 @@
+"""
+Request deduplication on canonical URLs, remembering product pages across runs.
+"""
+import os
+import time
+import sqlite3
+import logging
+
+from scrapy import signals
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.utils.project import data_path
+
+
+class CanonicalDupeFilter(RFPDupeFilter):
+    """
+    Filter requests whose canonical URL was already requested.
+
+    URLs go through the spider's ``canonical_url`` (see BaseSpider), so a
+    product linked from several collections, or with tracking parameters,
+    is fetched once per run. Fingerprints are kept as 64-bit integers
+    rather than 20-byte digests.
+
+    Product pages (requests to one of HTTPCACHE_PRODUCT_CALLBACKS) that
+    were fetched successfully are also recorded in a per-spider SQLite
+    table, and skipped by later runs for SEEN_URLS_MAX_AGE_HOURS. Listing
+    pages are never skipped across runs, so new products are still found.
+
+    Args:
+        debug (bool): Log every filtered request
+        fingerprinter: Crawler request fingerprinter
+        canonicalize (callable): URL -> canonical URL
+        seen_db (str): SQLite file of recently fetched product pages, None to disable
+        max_age (float): Seconds a fetched product page is skipped for
+        product_callbacks (iterable): Names of the product page callbacks
+        stats (StatsCollector): Crawl stats
+    """
+
+    # Fetched product pages are written to the database in batches of this size
+    FLUSH_EVERY = 100
+
+    def __init__(self, debug=False, *, fingerprinter=None, canonicalize=None, seen_db=None,
+                 max_age=0.0, product_callbacks=('parse_product',), stats=None):
+        super().__init__(None, debug, fingerprinter=fingerprinter)
+        self.canonicalize = canonicalize
+        self.seen_db = seen_db
+        self.max_age = max_age
+        self.product_callbacks = set(product_callbacks)
+        self.stats = stats
+        self.db = None
+        self._keys = set()
+        self._fresh = set()  # Product pages fetched by a recent run
+        self._fetched = []  # (key, time) of product pages not yet written
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        max_age = settings.getfloat('SEEN_URLS_MAX_AGE_HOURS', 0) * 3600
+        seen_db = None
+        if max_age > 0 and settings.get('SEEN_URLS_DIR'):
+            seen_dir = data_path(settings.get('SEEN_URLS_DIR'), createdir=True)
+            seen_db = os.path.join(seen_dir, f"{crawler.spider.name}.sqlite")
+
+        dupefilter = cls(
+            settings.getbool('DUPEFILTER_DEBUG'),
+            fingerprinter=crawler.request_fingerprinter,
+            canonicalize=getattr(crawler.spider, 'canonical_url', None),
+            seen_db=seen_db,
+            max_age=max_age,
+            product_callbacks=settings.getlist('HTTPCACHE_PRODUCT_CALLBACKS', ['parse_product']),
+            stats=crawler.stats,
+        )
+        if seen_db:
+            crawler.signals.connect(dupefilter.response_received, signal=signals.response_received)
+        return dupefilter
+
+    def open(self):
+        if not self.seen_db:
+            return
+        self.db = sqlite3.connect(self.seen_db)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS fetched (
+                fingerprint INTEGER PRIMARY KEY,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        cutoff = time.time() - self.max_age
+        with self.db:
+            self.db.execute("DELETE FROM fetched WHERE fetched_at < ?", (cutoff,))
+        self._fresh = {key for (key,) in self.db.execute("SELECT fingerprint FROM fetched")}
+        self.logger.info(f"Skipping {len(self._fresh)} product pages fetched in the last "
+                         f"{self.max_age / 3600:g}h ({self.seen_db})")
+
+    def close(self, reason):
+        if self.db is not None:
+            self._flush()
+            self.db.close()
+            self.db = None
+
+    def key(self, request):
+        """64-bit fingerprint of the request with its URL canonicalized"""
+        if self.canonicalize is not None:
+            url = self.canonicalize(request.url)
+            if url != request.url:
+                request = request.replace(url=url)
+        return int.from_bytes(self.fingerprinter.fingerprint(request)[:8], 'big', signed=True)
+
+    def is_product(self, request):
+        return getattr(request.callback, '__name__', None) in self.product_callbacks
+
+    def request_seen(self, request):
+        key = self.key(request)
+        if key in self._keys:
+            return True
+        self._keys.add(key)
+        if key in self._fresh and self.is_product(request):
+            if self.stats is not None:
+                self.stats.inc_value('dupefilter/fresh')
+            return True
+        return False
+
+    def response_received(self, response, request, spider):
+        """Record product pages that were fetched successfully"""
+        if response.status != 200 or not self.is_product(request):
+            return
+        self._fetched.append((self.key(request), time.time()))
+        if len(self._fetched) >= self.FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        if self._fetched and self.db is not None:
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO fetched VALUES (?, ?)", self._fetched)
+            self._fetched = []
@@ -0,0 +1,203 @@
+"""
+Persistent HTTP cache storage and freshness policy for incremental crawls.
+"""
+import os
+import zlib
+import sqlite3
+import logging
+from time import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.extensions.httpcache import RFC2616Policy
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+try:
+    import zstandard
+except ImportError:  # Fall back to zlib when zstandard isn't installed
+    zstandard = None
+
+
+class _Codec:
+    """Body compression, using zstd when available."""
+
+    def __init__(self, level):
+        self.name = 'zstd' if zstandard else 'zlib'
+        self.level = level
+        if zstandard:
+            self._compressor = zstandard.ZstdCompressor(level=level)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data):
+        if self.name == 'zstd':
+            return self._compressor.compress(data)
+        return zlib.compress(data, min(self.level, 9))
+
+    def decompress(self, data, name):
+        if name == 'zstd':
+            if not zstandard:
+                raise ValueError("Cache entry is zstd-compressed but zstandard isn't installed")
+            return self._decompressor.decompress(data)
+        return zlib.decompress(data)
+
+
+class SqliteCacheStorage:
+    """
+    HTTP cache storage backed by one SQLite database per spider.
+
+    Entries are keyed by request fingerprint and bodies are stored
+    compressed. ``cache_timestamp`` is set in the request meta on retrieval
+    so the policy can apply its freshness rules.
+    """
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.codec = _Codec(settings.getint('HTTPCACHE_ZSTD_LEVEL', 3))
+        self.logger = logging.getLogger(__name__)
+        self.db = None
+
+    def open_spider(self, spider):
+        path = os.path.join(self.cachedir, f"{spider.name}.sqlite")
+        self.logger.debug(f"Using SQLite cache storage in {path}")
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                fingerprint BLOB PRIMARY KEY,
+                url TEXT NOT NULL,
+                response_url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers BLOB NOT NULL,
+                body BLOB NOT NULL,
+                codec TEXT NOT NULL,
+                timestamp REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+        self._fingerprinter = spider.crawler.request_fingerprinter
+
+    def close_spider(self, spider):
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def retrieve_response(self, spider, request):
+        """Return response if present in cache, or None otherwise."""
+        row = self.db.execute(
+            "SELECT response_url, status, headers, body, codec, timestamp "
+            "FROM responses WHERE fingerprint = ?",
+            (self._fingerprinter.fingerprint(request),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        response_url, status, raw_headers, body, codec, timestamp = row
+        if 0 < self.expiration_secs < time() - timestamp:
+            return None
+
+        body = self.codec.decompress(body, codec)
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        request.meta['cache_timestamp'] = timestamp
+
+        response_class = responsetypes.from_args(headers=headers, url=response_url, body=body)
+        return response_class(url=response_url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        """Store the given response in the cache."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(fingerprint, url, response_url, status, headers, body, codec, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self._fingerprinter.fingerprint(request),
+                request.url,
+                response.url,
+                response.status,
+                headers_dict_to_raw(response.headers),
+                self.codec.compress(response.body),
+                self.codec.name,
+                time(),
+            ),
+        )
+        self.db.commit()
+
+
+class FreshnessPolicy(RFC2616Policy):
+    """
+    Cache policy with per-page-type freshness.
+
+    Responses handled by one of HTTPCACHE_PRODUCT_CALLBACKS (product pages)
+    are reused without revalidation for HTTPCACHE_PRODUCT_MAX_AGE_HOURS.
+    Everything else, such as listing pages, is always revalidated with
+    If-None-Match/If-Modified-Since, and a 304 is served from the cache.
+    Spiders can tune both settings through ``custom_settings``, and a
+    request can set ``httpcache_max_age`` (seconds) in its meta.
+    """
+
+    # Statuses worth storing; error pages are always refetched
+    CACHEABLE_STATUSES = {200, 203, 300, 301, 308}
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.product_max_age = settings.getfloat('HTTPCACHE_PRODUCT_MAX_AGE_HOURS', 12) * 3600
+        self.product_callbacks = set(settings.getlist('HTTPCACHE_PRODUCT_CALLBACKS', ['parse_product']))
+
+    def max_age(self, request):
+        """Seconds a cached response for this request can be reused without revalidation"""
+        if 'httpcache_max_age' in request.meta:
+            return float(request.meta['httpcache_max_age'])
+        if getattr(request.callback, '__name__', None) in self.product_callbacks:
+            return self.product_max_age
+        return 0.0
+
+    def should_cache_response(self, response, request):
+        if response.status not in self.CACHEABLE_STATUSES:
+            return False
+        return super().should_cache_response(response, request)
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        stored_at = request.meta.get('cache_timestamp')
+        if stored_at is not None and time() - stored_at < self.max_age(request):
+            return True
+
+        # Stale or always-revalidated: send validators so an unchanged page costs a 304
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+
+class HttpCacheStats:
+    """
+    Extension adding cache hit-rate and bytes saved to the crawl stats.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('HTTPCACHE_ENABLED'):
+            raise NotConfigured
+        extension = cls(crawler.stats)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def response_received(self, response, request, spider):
+        self.stats.inc_value('httpcache/responses')
+        # Fresh hits and 304-revalidated responses are both served from the cache
+        if 'cached' in response.flags:
+            self.stats.inc_value('httpcache/served_from_cache')
+            self.stats.inc_value('httpcache/bytes_saved', len(response.body))
+
+    def spider_closed(self, spider):
+        total = self.stats.get_value('httpcache/responses', 0)
+        cached = self.stats.get_value('httpcache/served_from_cache', 0)
+        if total:
+            self.stats.set_value('httpcache/hit_rate', round(cached / total, 4))
@@ -21,6 +21,7 @@ class ElectronicsItem(scrapy.Item):
     timestamp = scrapy.Field()
     normalized_name = scrapy.Field()
     price_zar = scrapy.Field()
+    canonical_id = scrapy.Field()
     
     def __init__(self, name=None, price=None, currency=None, specs=None, url=None, 
                  website=None, category=None, image_url=None, *args, **kwargs):
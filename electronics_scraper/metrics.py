@@ -0,0 +1,349 @@
+"""
+Hot-path timing histograms, exported as Prometheus text and a JSON snapshot.
+"""
+import os
+import json
+import time
+import inspect
+import logging
+import functools
+from contextlib import nullcontext
+from datetime import datetime
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+# Quantiles reported in snapshots and on /metrics
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """
+    Log-linear histogram of nanosecond durations, HDR style.
+
+    Values below 2 * 2**SUB_BUCKET_BITS get a bucket each; above that every
+    power of two is split into 2**SUB_BUCKET_BITS buckets, so a recorded
+    value is known to within 1/16 (6.25%) at any magnitude. Buckets are a
+    sparse dict of counts: a minute-long range needs at most ~600.
+    """
+
+    SUB_BUCKET_BITS = 4
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def bucket(cls, value):
+        """Index of the bucket holding ``value``"""
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            return value
+        return (shift << cls.SUB_BUCKET_BITS) + (value >> shift)
+
+    @classmethod
+    def bucket_bounds(cls, index):
+        """(lowest, highest) value of a bucket"""
+        size = 1 << cls.SUB_BUCKET_BITS
+        if index < 2 * size:
+            return index, index
+        shift = (index - size) >> cls.SUB_BUCKET_BITS
+        top = index - (shift << cls.SUB_BUCKET_BITS)
+        return top << shift, ((top + 1) << shift) - 1
+
+    def record(self, value):
+        """Record a duration in nanoseconds"""
+        index = self.bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Approximate ``q`` quantile in nanoseconds (bucket midpoint, within min/max)"""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Count, sum, min, max and quantiles, in seconds"""
+        summary = {
+            'count': self.count,
+            'sum': self.total / 1e9,
+            'min': (self.min or 0) / 1e9,
+            'max': self.max / 1e9,
+        }
+        summary.update((f"p{q * 100:g}", self.quantile(q) / 1e9) for q in QUANTILES)
+        return summary
+
+
+class _Timer:
+    """Context manager recording its block's duration into a histogram"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+
+
+class Metrics:
+    """
+    Named duration histograms for the stages of a crawl.
+
+    Stages are timed with ``timer(name)`` blocks, or by wrapping a
+    function with ``wrap(name, func)``. Generator and async generator
+    functions (spider callbacks) are timed while their output is consumed,
+    so a callback's time covers the items and requests it builds.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+        self.started = time.time()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def timer(self, name):
+        return _Timer(self.histogram(name))
+
+    def record(self, name, seconds):
+        self.histogram(name).record(int(seconds * 1e9))
+
+    def wrap(self, name, func):
+        """Return ``func`` timed into the ``name`` histogram"""
+        histogram = self.histogram(name)
+        clock = time.perf_counter_ns
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def timed(*args, **kwargs):
+                results = func(*args, **kwargs)
+                elapsed = 0
+                try:
+                    while True:
+                        start = clock()
+                        try:
+                            result = await results.__anext__()
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            elapsed += clock() - start
+                        yield result
+                finally:
+                    histogram.record(elapsed)
+        elif inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                results = func(*args, **kwargs)
+                elapsed = 0
+                try:
+                    while True:
+                        start = clock()
+                        try:
+                            result = next(results)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += clock() - start
+                        yield result
+                finally:
+                    histogram.record(elapsed)
+        elif inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.record(clock() - start)
+        else:
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.record(clock() - start)
+        return timed
+
+    def snapshot(self):
+        """Summary of every stage, in seconds"""
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'elapsed': round(time.time() - self.started, 3),
+            'stages': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def prometheus(self, labels=None):
+        """
+        Prometheus text exposition of the stages: a summary and the maximum per stage.
+
+        Args:
+            labels (dict): Extra labels added to every sample, e.g. the spider
+        """
+        extra = ''.join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        metric, max_metric = 'scraper_stage_duration_seconds', 'scraper_stage_max_seconds'
+        lines = [f"# HELP {metric} Time spent per crawl stage", f"# TYPE {metric} summary"]
+        for name, histogram in sorted(self.histograms.items()):
+            stage = f'stage="{name}"{extra}'
+            for q in QUANTILES:
+                lines.append(f'{metric}{{{stage},quantile="{q}"}} {histogram.quantile(q) / 1e9:.9f}')
+            lines.append(f"{metric}_sum{{{stage}}} {histogram.total / 1e9:.9f}")
+            lines.append(f"{metric}_count{{{stage}}} {histogram.count}")
+        lines += [f"# HELP {max_metric} Longest single call per crawl stage", f"# TYPE {max_metric} gauge"]
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f'{max_metric}{{stage="{name}"{extra}}} {histogram.max / 1e9:.9f}')
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetrics:
+    """Stand-in used while metrics are disabled; every hook is a no-op"""
+
+    enabled = False
+    _null_timer = nullcontext()
+
+    def timer(self, name):
+        return self._null_timer
+
+    def record(self, name, seconds):
+        pass
+
+    def wrap(self, name, func):
+        return func
+
+
+_metrics = NullMetrics()
+
+
+def get_metrics():
+    """The process-wide metrics, a NullMetrics unless enable_metrics() was called"""
+    return _metrics
+
+
+def enable_metrics():
+    """Start collecting metrics in this process"""
+    global _metrics
+    if not _metrics.enabled:
+        _metrics = Metrics()
+    return _metrics
+
+
+class MetricsExtension:
+    """
+    Extension timing the hot paths of a crawl when METRICS_ENABLED is set.
+
+    Records download latency, every spider callback (methods named
+    ``parse*``), the spider methods in METRICS_SPIDER_METHODS, and the
+    stages the pipeline and BaseSpider time through get_metrics(). The
+    histograms are served as Prometheus text on ``/metrics`` from a port
+    in METRICS_PORT, and written as JSON next to the crawl results on
+    close. When disabled, nothing is wrapped and the pipeline's timers are
+    shared no-op context managers.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.metrics = enable_metrics()
+        self.spider_methods = settings.getlist('METRICS_SPIDER_METHODS', ['create_item'])
+        self.port_range = settings.getlist('METRICS_PORT', [9410, 9430])
+        self.host = settings.get('METRICS_HOST', '127.0.0.1')
+        self.results_dir = settings.get('RESULTS_DIR', 'results')
+        self.listener = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        extension = cls(crawler)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.response_downloaded, signal=signals.response_downloaded)
+        return extension
+
+    def spider_opened(self, spider):
+        self.instrument(spider)
+        if self.port_range:
+            self.listen(spider)
+
+    def instrument(self, spider):
+        """Replace the spider's callbacks and METRICS_SPIDER_METHODS with timed wrappers"""
+        names = {name for name in dir(type(spider))
+                 if name.startswith('parse') and callable(getattr(type(spider), name))}
+        for name in sorted(names):
+            setattr(spider, name, self.metrics.wrap(f"callback.{name}", getattr(spider, name)))
+        for name in self.spider_methods:
+            if hasattr(spider, name):
+                setattr(spider, name, self.metrics.wrap(f"spider.{name}", getattr(spider, name)))
+
+    def listen(self, spider):
+        """Serve /metrics on the first free port of METRICS_PORT"""
+        from twisted.web.resource import Resource
+        from twisted.web.server import Site
+        from scrapy.utils.reactor import listen_tcp
+
+        metrics = self.metrics
+
+        class MetricsResource(Resource):
+            isLeaf = True
+
+            def render_GET(self, request):
+                request.setHeader(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+                return metrics.prometheus({'spider': spider.name}).encode('utf-8')
+
+        root = Resource()
+        root.putChild(b'metrics', MetricsResource())
+        self.listener = listen_tcp([int(port) for port in self.port_range], self.host, Site(root))
+        address = self.listener.getHost()
+        self.logger.info(f"Serving metrics on http://{address.host}:{address.port}/metrics")
+
+    def response_downloaded(self, response, request, spider):
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            self.metrics.record('download', latency)
+
+    def spider_closed(self, spider, reason):
+        if self.listener is not None:
+            self.listener.stopListening()
+            self.listener = None
+
+        snapshot = self.metrics.snapshot()
+        snapshot.update(spider=spider.name, reason=reason)
+        os.makedirs(self.results_dir, exist_ok=True)
+        path = os.path.join(self.results_dir,
+                            f"{spider.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_metrics.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+
+        for name, summary in snapshot['stages'].items():
+            self.logger.info(f"{name:<36} {summary['count']:>8} calls, {summary['sum']:9.3f}s total, "
+                             f"p50 {summary['p50'] * 1000:.3f}ms, p99 {summary['p99'] * 1000:.3f}ms")
+        self.logger.info(f"Saved metrics snapshot to {path}")
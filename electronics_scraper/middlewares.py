@@ -1,10 +1,16 @@
 """
 Custom middlewares for the electronics scraper.
 """
+import time
 import random
 import logging
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
 from scrapy.downloadermiddlewares.useragent import UserAgentMiddleware
 
+from electronics_scraper.utils.fixtures import FixtureStore
+from electronics_scraper.browser import PagePool, browser_rss, discard_page
+
 
 class RandomUserAgentMiddleware(UserAgentMiddleware):
     """Middleware to rotate user agents."""
@@ -61,4 +67,106 @@ class ProxyMiddleware:
         if 'backmarket.com' in request.url:
             proxy = random.choice(self.proxy_list)
             request.meta['proxy'] = proxy
-            self.logger.debug(f"Using proxy: {proxy} for {request.url}")
\ No newline at end of file
+            self.logger.debug(f"Using proxy: {proxy} for {request.url}")
+
+class FixtureRecorderMiddleware:
+    """Middleware to record responses into a fixture store for offline replay."""
+    
+    def __init__(self, store):
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('FIXTURE_RECORD_DIR')
+        if not path:
+            raise NotConfigured("FIXTURE_RECORD_DIR is not set")
+        return cls(FixtureStore(path))
+    
+    def process_response(self, request, response, spider):
+        self.store.record(spider.name, request, response)
+        self.logger.debug(f"Recorded fixture for {response.url}")
+        return response
+
+
+class BrowserPageMiddleware:
+    """Middleware to reuse browser pages across requests and record render stats."""
+    
+    # Seconds between browser memory samples
+    RSS_SAMPLE_INTERVAL = 10.0
+    
+    def __init__(self, stats, pool_size):
+        self.stats = stats
+        self.pool = PagePool(pool_size)
+        self.render_times = []
+        self._last_rss_sample = 0.0
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_crawler(cls, crawler):
+        handlers = crawler.settings.getdict('DOWNLOAD_HANDLERS')
+        if not any('scrapy_playwright' in str(handler) for handler in handlers.values()):
+            raise NotConfigured("Playwright download handler is not enabled")
+        pool_size = int(crawler.settings.get('BROWSER_PAGE_POOL_SIZE') or
+                        crawler.settings.getint('PLAYWRIGHT_MAX_PAGES_PER_CONTEXT', 4))
+        middleware = cls(crawler.stats, pool_size)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+    
+    def process_request(self, request, spider):
+        if not request.meta.get('playwright'):
+            return None
+        request.meta['_browser_start'] = time.monotonic()
+        
+        # Pages the spider asks for are its own to close; everything else is pooled
+        if request.meta.get('playwright_include_page') or not request.meta.get('browser_reuse_page', True):
+            return None
+        request.meta['_browser_pooled'] = True
+        request.meta['playwright_include_page'] = True
+        page = self.pool.acquire(request.meta.get('playwright_context', 'default'))
+        if page is not None:
+            request.meta['playwright_page'] = page
+            self.stats.inc_value('browser/pages_reused')
+    
+    def process_response(self, request, response, spider):
+        start = request.meta.pop('_browser_start', None)
+        if start is None:
+            return response
+        
+        render_time = time.monotonic() - start
+        self.render_times.append(render_time)
+        self.stats.inc_value('browser/renders')
+        self.stats.max_value('browser/render_time_max', round(render_time, 3))
+        self._sample_rss()
+        
+        if request.meta.pop('_browser_pooled', False):
+            page = response.meta.pop('playwright_page', None)
+            if page is not None:
+                self.pool.release(request.meta.get('playwright_context', 'default'), page)
+        return response
+    
+    def process_exception(self, request, exception, spider):
+        request.meta.pop('_browser_start', None)
+        if request.meta.pop('_browser_pooled', False):
+            # A page that failed to render isn't trusted for reuse
+            page = request.meta.pop('playwright_page', None)
+            if page is not None:
+                discard_page(page)
+    
+    def _sample_rss(self):
+        now = time.monotonic()
+        if now - self._last_rss_sample < self.RSS_SAMPLE_INTERVAL:
+            return
+        self._last_rss_sample = now
+        rss = browser_rss()
+        if rss is not None:
+            self.stats.max_value('browser/rss_max_bytes', rss)
+    
+    def spider_closed(self, spider):
+        self._sample_rss()
+        self.pool.clear()
+        if self.render_times:
+            times = sorted(self.render_times)
+            self.stats.set_value('browser/render_time_p50', round(times[len(times) // 2], 3))
+            self.stats.set_value('browser/render_time_p95', round(times[int(len(times) * 0.95)], 3))
+            self.stats.set_value('browser/render_time_avg', round(sum(times) / len(times), 3))
@@ -3,25 +3,92 @@ Data processing pipeline for the electronics scraper.
 """
 import os
 import json
+import time
 import logging
-import pandas as pd
 from datetime import datetime
 
 from electronics_scraper.utils.normalizer import normalize_product_name
-from electronics_scraper.utils.currency import convert_to_zar
-from electronics_scraper.utils.matcher import group_similar_products
+from electronics_scraper.utils.currency import get_rate_provider
+from electronics_scraper.utils.sinks import open_sinks
+from electronics_scraper.utils.price_history import PriceHistoryStore
+from electronics_scraper.metrics import get_metrics
 
 
 class DataProcessingPipeline:
-    """Pipeline for processing and analyzing scraped data"""
-    
-    def __init__(self):
-        self.data = []
+    """
+    Pipeline for processing and analyzing scraped data.
+
+    Processed items are buffered and streamed to the configured sinks in
+    batches, so memory use doesn't grow with the crawl. Each batch is also
+    recorded in the price history database when one is configured.
+
+    With a canonical catalog configured, each item is matched on ingest and
+    gets a ``canonical_id``, and the matches written on close are simply
+    the cross-site groups of those ids. Otherwise matching runs on close by
+    reading the written results back, using the configured similarity
+    backend.
+
+    The matching stack (pandas, NumPy, scikit-learn) is only imported once
+    the first item is matched, so crawls start without loading it.
+
+    Each stage is timed through get_metrics() (see metrics.py), a no-op
+    unless METRICS_ENABLED is set.
+    """
+
+    def __init__(self, results_dir='results', flush_size=500, flush_interval=30.0,
+                 sinks=('jsonl', 'parquet'), price_history_db=None, catalog_dir=None,
+                 match_threshold=0.7, similarity_backend=None, similarity_options=None,
+                 match_on_close=True):
+        self.results_dir = results_dir
+        self.price_history_db = price_history_db
+        self.history = None
+        self.catalog_dir = catalog_dir
+        self.match_threshold = match_threshold
+        self.catalog = None
+        self.similarity_backend = similarity_backend
+        self.similarity_options = similarity_options or {}
+        self.match_on_close = match_on_close
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.sink_names = list(sinks)
+        self.sinks = []
+        self.metrics = get_metrics()
+        self.buffer = []
+        self.item_count = 0
+        self._last_flush = time.monotonic()
         self.file_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.logger = logging.getLogger(__name__)
+        # Exchange rates are loaded once per process and shared with the spiders
+        self.rate_provider = get_rate_provider()
         # Create results directory if it doesn't exist
-        os.makedirs('results', exist_ok=True)
-    
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            results_dir=settings.get('RESULTS_DIR', 'results'),
+            flush_size=settings.getint('PIPELINE_FLUSH_SIZE', 500),
+            flush_interval=settings.getfloat('PIPELINE_FLUSH_INTERVAL', 30.0),
+            sinks=settings.getlist('PIPELINE_SINKS', ['jsonl', 'parquet']),
+            price_history_db=settings.get('PRICE_HISTORY_DB'),
+            catalog_dir=settings.get('CANONICAL_CATALOG_DIR'),
+            match_threshold=settings.getfloat('CANONICAL_MATCH_THRESHOLD', 0.7),
+            similarity_backend=settings.get('SIMILARITY_BACKEND'),
+            similarity_options=settings.getdict('SIMILARITY_BACKEND_OPTIONS'),
+            match_on_close=settings.getbool('PIPELINE_MATCH_ON_CLOSE', True),
+        )
+
+    def open_spider(self, spider):
+        """Load exchange rates and open the result sinks"""
+        self.rate_provider.get_rates()
+        self.base_path = os.path.join(self.results_dir, f"{spider.name}_{self.file_timestamp}")
+        self.sinks = open_sinks(self.base_path, self.sink_names)
+        # The metrics extension is enabled once the crawler is configured
+        self.metrics = get_metrics()
+        if self.price_history_db:
+            self.history = PriceHistoryStore(self.price_history_db)
+
     def process_item(self, item, spider):
         """Process each scraped item"""
         try:
@@ -30,25 +97,126 @@ class DataProcessingPipeline:
                 self.logger.warning(f"Skipping item with missing essential data: {dict(item)}")
                 return item
 
+            metrics = self.metrics
+
             # Add normalized product name
-            item['normalized_name'] = normalize_product_name(item.get('name', ''))
-            
+            with metrics.timer('pipeline.normalize_product_name'):
+                item['normalized_name'] = normalize_product_name(item.get('name', ''))
+
             # Convert price to ZAR
-            item['price_zar'] = convert_to_zar(item.get('price'), item.get('currency', 'ZAR'))
-            
+            with metrics.timer('pipeline.convert_to_zar'):
+                item['price_zar'] = self.rate_provider.convert(item.get('price'), item.get('currency', 'ZAR'))
+
+            # Assign the canonical product
+            if self.catalog_dir:
+                with metrics.timer('pipeline.catalog_match'):
+                    item['canonical_id'] = self.get_catalog().match(item['normalized_name'])
+
             # Create a debug-friendly string representation
             debug_info = f"{item.get('name')} - {item.get('price_zar')} - {item.get('website')}"
             self.logger.info(f"Processed item: {debug_info}")
-            
-            # Store processed item
-            self.data.append(dict(item))
-            self.logger.debug(f"Added item to data collection. Total items: {len(self.data)}")
-            
+
+            # Buffer processed item until the next flush
+            self.buffer.append(dict(item))
+            if (len(self.buffer) >= self.flush_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
             return item
         except Exception as e:
             self.logger.error(f"Error processing item: {e}")
             # Don't lose the item even if processing fails
             return item
-    
+
+    def get_catalog(self):
+        """The canonical catalog, loaded on first use"""
+        if self.catalog is None:
+            from electronics_scraper.utils.matcher import get_catalog
+
+            self.catalog = get_catalog(self.catalog_dir, self.match_threshold)
+        return self.catalog
+
+    def flush(self):
+        """Write buffered items to every sink"""
+        if self.buffer:
+            with self.metrics.timer('pipeline.write_sinks'):
+                for sink in self.sinks:
+                    sink.write_batch(self.buffer)
+            if self.history is not None:
+                with self.metrics.timer('pipeline.price_history'):
+                    changes = self.history.write_batch(self.buffer)
+                self.logger.debug(f"Recorded {changes} price changes")
+            self.item_count += len(self.buffer)
+            self.logger.debug(f"Flushed {len(self.buffer)} items. Total items: {self.item_count}")
+            self.buffer = []
+        self._last_flush = time.monotonic()
+
     def close_spider(self, spider):
-        """Process all data after spider completes"""
\ No newline at end of file
+        """Process all data after spider completes"""
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+        if self.history is not None:
+            self.history.close()
+        if self.catalog is not None and self.catalog.dirty:
+            self.catalog.save()
+
+        if not self.item_count:
+            self.logger.info(f"No items collected for {spider.name}")
+            return
+        if not self.match_on_close:
+            return
+
+        matches_file = f"{self.base_path}_matches.json"
+        with self.metrics.timer('pipeline.matching'):
+            count = write_matches(self.read_results(), matches_file, by_canonical=bool(self.catalog_dir),
+                                  backend=self.similarity_backend, **self.similarity_options)
+        self.logger.info(f"Saved {count} product groups from {self.item_count} items to {matches_file}")
+
+    def read_results(self):
+        """Read the written items back, preferring the columnar file"""
+        sinks = sorted(self.sinks, key=lambda sink: sink.extension != 'parquet')
+        if not sinks:
+            import pandas as pd
+
+            return pd.DataFrame()
+        return sinks[0].read_frame()
+
+
+def json_record(member):
+    """Convert an item or matched row to a JSON-safe dict (missing values become null)"""
+    import pandas as pd
+
+    record = member if isinstance(member, dict) else member.to_dict()
+    return {key: None if pd.api.types.is_scalar(value) and pd.isna(value) else value
+            for key, value in record.items()}
+
+
+def write_matches(df, matches_file, by_canonical=False, backend=None, **options):
+    """
+    Group matching products and write the groups as JSON.
+
+    Args:
+        df (DataFrame): Processed items
+        matches_file (str): Output path
+        by_canonical (bool): Group by the canonical_id assigned on ingest
+            instead of running similarity matching
+        backend: Similarity backend name or instance
+        **options: Constructor arguments of a named backend
+
+    Returns:
+        int: Number of groups written
+    """
+    from electronics_scraper.utils.matcher import (
+        enhance_product_matching, find_exact_matches, get_similarity_backend
+    )
+
+    if by_canonical and 'canonical_id' in df.columns:
+        matches = find_exact_matches(df, ['canonical_id'])
+    else:
+        matches = enhance_product_matching(df, backend=get_similarity_backend(backend, **options))
+
+    with open(matches_file, 'w', encoding='utf-8') as f:
+        json.dump([[json_record(member) for member in group] for group in matches],
+                  f, ensure_ascii=False, indent=2, default=str)
+    return len(matches)
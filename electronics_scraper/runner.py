@@ -0,0 +1,344 @@
+"""
+Run spiders, or shards of a spider's start URLs, in parallel worker processes.
+"""
+import os
+import glob
+import json
+import time
+import queue
+import logging
+import multiprocessing
+from datetime import datetime
+
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import get_project_settings
+
+# Spiders crawled by default; the browser-rendered one first since it takes longest
+SPIDERS = {
+    'backmarket': 'electronics_scraper.spiders.backmarket_spider.BackMarketSpider',
+    'bobshop': 'electronics_scraper.spiders.bobshop_spider.BobShopSpider',
+    'revibe': 'electronics_scraper.spiders.revibe_spider.RevibeSpider',
+    'istore': 'electronics_scraper.spiders.istore_spider.IStorePreOwnedSpider',
+    'gorilla': 'electronics_scraper.spiders.gorilla_spider.GorillaPhoneSpider',
+}
+
+# Seconds a worker gets to close after CLOSESPIDER_TIMEOUT before it is killed
+KILL_GRACE_PERIOD = 60
+
+
+def parse_shard(value):
+    """
+    Parse a CRAWL_SHARD setting of the form 'index/count'.
+
+    Returns:
+        tuple: (index, count), (0, 1) when unset
+    """
+    if not value:
+        return 0, 1
+    index, count = (int(part) for part in str(value).split('/'))
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}, expected 'index/count' with 0 <= index < count")
+    return index, count
+
+
+def parse_shards(spec):
+    """
+    Parse a shard spec such as 'bobshop=3,backmarket=2'.
+
+    Returns:
+        dict: Spider name -> number of shards
+    """
+    shards = {}
+    for part in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, count = part.partition('=')
+        shards[name.strip()] = int(count)
+    return shards
+
+
+class CrawlJob:
+    """
+    One spider, or one shard of its start URLs, crawled in its own process.
+    """
+
+    def __init__(self, spider, shard=0, shards=1):
+        self.spider = spider
+        self.shard = shard
+        self.shards = shards
+
+    @property
+    def key(self):
+        return self.spider if self.shards == 1 else f"{self.spider}_{self.shard + 1}of{self.shards}"
+
+    def settings(self, run_dir, timeout=None):
+        """
+        Setting overrides for the job's worker process.
+
+        Workers only stream items to their own sinks. Matching, the price
+        history and the canonical catalog are handled once for the whole
+        crawl by CrawlRunner.merge, so no two processes write them.
+        """
+        overrides = {
+            'RESULTS_DIR': os.path.join(run_dir, self.key),
+            'LOG_FILE': os.path.join(run_dir, f"{self.key}.log"),
+            'PIPELINE_MATCH_ON_CLOSE': False,
+            'PRICE_HISTORY_DB': None,
+            'CANONICAL_CATALOG_DIR': None,
+        }
+        if self.shards > 1:
+            overrides['CRAWL_SHARD'] = f"{self.shard}/{self.shards}"
+        if timeout:
+            overrides['CLOSESPIDER_TIMEOUT'] = timeout
+        return overrides
+
+
+def _json_safe(stats):
+    """Crawl stats with datetimes and other objects converted for JSON"""
+    return {key: value if isinstance(value, (int, float, str, bool, type(None))) else
+            value.isoformat() if isinstance(value, datetime) else str(value)
+            for key, value in stats.items()}
+
+
+def _crawl(key, spider_path, overrides, results):
+    """Worker process entry point: crawl one job and report its stats"""
+    from scrapy.crawler import CrawlerProcess
+
+    settings = get_project_settings()
+    settings.setdict(overrides, priority='cmdline')
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(load_object(spider_path))
+    process.crawl(crawler)
+    process.start()
+    results.put((key, _json_safe(crawler.stats.get_stats())))
+
+
+def aggregate_stats(stats_by_job):
+    """
+    Combine the crawl stats of several jobs.
+
+    Integer counters are summed and values named ``*max*`` take the
+    maximum. Rates, percentiles and timestamps are only meaningful per
+    job and are left out.
+
+    Returns:
+        dict: Combined stats, sorted by key
+    """
+    totals = {}
+    for stats in stats_by_job:
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if 'max' in key:
+                totals[key] = max(totals.get(key, value), value)
+            elif isinstance(value, int):
+                totals[key] = totals.get(key, 0) + value
+    return dict(sorted(totals.items()))
+
+
+class CrawlRunner:
+    """
+    Crawl jobs in parallel worker processes and merge their results.
+
+    Every job runs in a freshly spawned process with its own Twisted
+    reactor, so parsing and item processing of different spiders, and of
+    shards of one spider, use separate cores, and a browser-rendered
+    spider doesn't slow down the HTML ones. Each run writes to
+    ``<RESULTS_DIR>/crawl_<timestamp>/``: one directory and log per job,
+    then the merged items, matches and stats.
+
+    Args:
+        settings (Settings): Project settings
+        workers (int): Maximum concurrent worker processes (default: one per job)
+        timeout (int): Per-job crawl time limit in seconds; the spider is
+            closed gracefully, and killed KILL_GRACE_PERIOD seconds later
+    """
+
+    def __init__(self, settings=None, workers=None, timeout=None):
+        self.settings = settings if settings is not None else get_project_settings()
+        self.workers = workers
+        self.timeout = timeout
+        self.run_dir = os.path.join(self.settings.get('RESULTS_DIR', 'results'),
+                                    f"crawl_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.logger = logging.getLogger(__name__)
+
+    def jobs(self, spiders=None, shards=None):
+        """
+        Build the jobs for a crawl.
+
+        Args:
+            spiders (list): Spider names from SPIDERS (default: all)
+            shards (dict): Spider name -> number of shards, capped at the
+                spider's number of start URLs
+
+        Returns:
+            list: CrawlJob instances
+        """
+        shards = shards or {}
+        unknown = sorted(set(spiders or ()) - set(SPIDERS))
+        if unknown:
+            raise ValueError(f"Unknown spiders {unknown}, expected some of {sorted(SPIDERS)}")
+
+        jobs = []
+        for name in spiders or SPIDERS:
+            count = shards.get(name, 1)
+            if count > 1:
+                count = min(count, len(load_object(SPIDERS[name]).start_urls))
+            jobs.extend(CrawlJob(name, shard, max(count, 1)) for shard in range(max(count, 1)))
+        return jobs
+
+    def run(self, jobs):
+        """
+        Crawl the jobs, at most ``workers`` at a time.
+
+        Returns:
+            dict: Job key -> report with status, exit code, elapsed seconds and stats
+        """
+        os.makedirs(self.run_dir, exist_ok=True)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        pending = list(jobs)
+        running = {}
+        reports = {}
+        workers = self.workers or len(jobs)
+
+        while pending or running:
+            while pending and len(running) < workers:
+                job = pending.pop(0)
+                process = context.Process(
+                    target=_crawl, name=f"crawl-{job.key}",
+                    args=(job.key, SPIDERS[job.spider], job.settings(self.run_dir, self.timeout), results),
+                )
+                process.start()
+                running[job.key] = (process, time.monotonic())
+                self.logger.info(f"Started {job.key} (pid {process.pid})")
+
+            self._collect_stats(results, reports, timeout=1.0)
+
+            for key, (process, started) in list(running.items()):
+                elapsed = time.monotonic() - started
+                if process.is_alive():
+                    if not self.timeout or elapsed < self.timeout + KILL_GRACE_PERIOD:
+                        continue
+                    self.logger.warning(f"Killing {key}, still running after {elapsed:.0f}s")
+                    process.terminate()
+                process.join()
+                del running[key]
+                # A worker's stats are in the queue before it exits
+                self._collect_stats(results, reports)
+
+                report = reports.setdefault(key, {'stats': {}})
+                report.update(exitcode=process.exitcode, elapsed=round(elapsed, 1))
+                reason = report['stats'].get('finish_reason')
+                if process.exitcode != 0:
+                    report['status'] = 'killed' if process.exitcode < 0 else 'failed'
+                else:
+                    report['status'] = 'timeout' if reason == 'closespider_timeout' else 'finished'
+                self.logger.info(f"{key} {report['status']} in {elapsed:.0f}s, "
+                                 f"{report['stats'].get('item_scraped_count', 0)} items")
+        return reports
+
+    @staticmethod
+    def _collect_stats(results, reports, timeout=None):
+        """Move the stats reported by finished workers into their reports"""
+        while True:
+            try:
+                key, stats = results.get(timeout=timeout) if timeout else results.get_nowait()
+            except queue.Empty:
+                return
+            reports.setdefault(key, {})['stats'] = stats
+            timeout = None
+
+    def merge(self):
+        """
+        Merge the items of every job and run the crawl-wide steps once.
+
+        Items are streamed to one set of sinks under the run directory,
+        matched against the canonical catalog and recorded in the price
+        history in batches, then grouped into cross-site matches.
+
+        Returns:
+            int: Number of items merged
+        """
+        from electronics_scraper.pipelines import json_record, write_matches
+        from electronics_scraper.utils.sinks import open_sinks, read_results
+        from electronics_scraper.utils.matcher import get_catalog
+        from electronics_scraper.utils.price_history import PriceHistoryStore
+
+        settings = self.settings
+        job_outputs = sorted({os.path.splitext(path)[0] for pattern in ('*.parquet', '*.jsonl')
+                              for path in glob.glob(os.path.join(self.run_dir, '*', pattern))})
+        catalog = None
+        if settings.get('CANONICAL_CATALOG_DIR'):
+            catalog = get_catalog(settings.get('CANONICAL_CATALOG_DIR'),
+                                  settings.getfloat('CANONICAL_MATCH_THRESHOLD', 0.7))
+        history = PriceHistoryStore(settings.get('PRICE_HISTORY_DB')) if settings.get('PRICE_HISTORY_DB') else None
+        base_path = os.path.join(self.run_dir, 'items')
+        sinks = open_sinks(base_path, settings.getlist('PIPELINE_SINKS', ['jsonl', 'parquet']))
+        batch_size = settings.getint('PIPELINE_FLUSH_SIZE', 500)
+
+        count = 0
+        for job_output in job_outputs:
+            records = [json_record(row) for row in read_results(job_output).to_dict('records')]
+            for offset in range(0, len(records), batch_size):
+                batch = records[offset:offset + batch_size]
+                if catalog is not None:
+                    for record in batch:
+                        if record.get('normalized_name') is not None:
+                            record['canonical_id'] = catalog.match(record['normalized_name'])
+                for sink in sinks:
+                    sink.write_batch(batch)
+                if history is not None:
+                    history.write_batch(batch)
+            count += len(records)
+
+        for sink in sinks:
+            sink.close()
+        if history is not None:
+            history.close()
+        if catalog is not None and catalog.dirty:
+            catalog.save()
+        if not count:
+            self.logger.info("No items collected")
+            return 0
+
+        matches_file = f"{base_path}_matches.json"
+        groups = write_matches(read_results(base_path), matches_file, by_canonical=catalog is not None,
+                               backend=settings.get('SIMILARITY_BACKEND'),
+                               **settings.getdict('SIMILARITY_BACKEND_OPTIONS'))
+        self.logger.info(f"Merged {count} items from {len(job_outputs)} jobs, "
+                         f"saved {groups} product groups to {matches_file}")
+        return count
+
+    def crawl(self, spiders=None, shards=None):
+        """
+        Run a full crawl: the jobs in parallel, then the merge.
+
+        Args:
+            spiders (list): Spider names from SPIDERS (default: all)
+            shards (dict): Spider name -> number of shards
+
+        Returns:
+            dict: Summary with per-job reports, combined stats and timings,
+            also written to stats.json in the run directory
+        """
+        jobs = self.jobs(spiders, shards)
+        self.logger.info(f"Crawling {len(jobs)} jobs with up to {self.workers or len(jobs)} "
+                         f"workers into {self.run_dir}")
+        start = time.monotonic()
+        reports = self.run(jobs)
+        items = self.merge()
+        elapsed = time.monotonic() - start
+
+        crawl_time = sum(report.get('elapsed', 0) for report in reports.values())
+        summary = {
+            'elapsed': round(elapsed, 1),
+            'crawl_time': round(crawl_time, 1),
+            'items': items,
+            'totals': aggregate_stats(report['stats'] for report in reports.values()),
+            'jobs': reports,
+        }
+        with open(os.path.join(self.run_dir, 'stats.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        self.logger.info(f"Crawl finished in {elapsed:.0f}s wall-clock for {crawl_time:.0f}s of crawling "
+                         f"({crawl_time / max(elapsed, 1e-9):.1f}x parallel), {items} items")
+        return summary
@@ -1,6 +1,19 @@
-# Modified settings.py - add these new settings
-DOWNLOAD_DELAY = 5  # Increase from 2 to 5 seconds
+# Crawl rate is set per spider from its throttle profile (see throttle.py);
+# these are only the fallbacks for spiders without one
+DOWNLOAD_DELAY = 5
 RANDOMIZE_DOWNLOAD_DELAY = True
+CONCURRENT_REQUESTS = 16
+
+# Tune each domain's delay from observed latency and back off on 429/503
+AUTOTHROTTLE_ENABLED = True
+THROTTLE_BACKOFF_HTTP_CODES = [429, 503]
+THROTTLE_BACKOFF_FACTOR = 2.0
+THROTTLE_RECOVERY_FACTOR = 0.9
+# Override or add profiles here, e.g. {'shopify': {'CONCURRENT_REQUESTS_PER_DOMAIN': 4}}
+THROTTLE_PROFILES = {}
+# Crawl every nth start URL from the ith, as 'i/n', splitting the per-domain
+# budget n ways; set per worker by run.py --shards
+CRAWL_SHARD = None
 
 # Rotate user agents
 USER_AGENT_LIST = [
@@ -15,15 +28,90 @@ DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'electronics_scraper.middlewares.RandomUserAgentMiddleware': 400,
     'electronics_scraper.middlewares.ProxyMiddleware': 350,
+    # Records decompressed responses when FIXTURE_RECORD_DIR is set (see benchmarks/replay.py)
+    'electronics_scraper.middlewares.FixtureRecorderMiddleware': 580,
+    # Pools browser pages; only enabled for spiders using browser.BROWSER_SETTINGS
+    'electronics_scraper.middlewares.BrowserPageMiddleware': 950,
 }
 
-# For sites like BackMarket that require JavaScript
-DOWNLOAD_HANDLERS = {
-    "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-    "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-}
+# Playwright is only installed as download handler by spiders that need
+# JavaScript (custom_settings = browser.BROWSER_SETTINGS), and needs the asyncio reactor
+TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+BROWSER_PAGE_POOL_SIZE = None  # Defaults to PLAYWRIGHT_MAX_PAGES_PER_CONTEXT
 
 PLAYWRIGHT_LAUNCH_OPTIONS = {
     "headless": True,
     "timeout": 30 * 1000,  # 30 seconds
-}
\ No newline at end of file
+}
+
+ITEM_PIPELINES = {
+    'electronics_scraper.pipelines.DataProcessingPipeline': 300,
+}
+
+# Stream processed items to disk in batches instead of holding the crawl in memory
+RESULTS_DIR = 'results'
+PIPELINE_FLUSH_SIZE = 500  # Items per batch / Parquet row group
+PIPELINE_FLUSH_INTERVAL = 30  # Seconds before a partial batch is flushed
+PIPELINE_SINKS = ['jsonl', 'parquet']  # Parquet is skipped if pyarrow isn't installed
+PIPELINE_MATCH_ON_CLOSE = True  # Off in run.py workers, which match the merged crawl instead
+# Price history across runs (see utils/price_history.py); None disables it
+PRICE_HISTORY_DB = 'results/price_history.sqlite'
+# Canonical product catalog items are matched against on ingest; None matches
+# each crawl in batch on close instead. Compact it periodically with
+# python run.py --compact-catalog
+CANONICAL_CATALOG_DIR = 'results/catalog'
+CANONICAL_MATCH_THRESHOLD = 0.7
+# Candidate generation when matching in batch on close: 'tfidf' scores every
+# pair, 'minhash' only pairs sharing a MinHash-LSH bucket (see utils/matcher.py)
+SIMILARITY_BACKEND = 'tfidf'
+SIMILARITY_BACKEND_OPTIONS = {}  # e.g. {'num_perm': 128, 'bands': 32} for minhash
+
+# Fetch Shopify collections via products.json (250 products per request) instead of HTML pages
+SHOPIFY_PRODUCTS_JSON = True
+
+# Winning fallback selectors per spider and domain, kept between runs (under .scrapy/)
+SELECTOR_CACHE_DIR = 'selectors'
+
+# Failure diagnostics: off, counters (stats only), sample (dump 1 in
+# DIAGNOSTICS_SAMPLE_RATE failing pages) or full; -a diagnostics=<level> per run
+DIAGNOSTICS_LEVEL = 'counters'
+DIAGNOSTICS_SAMPLE_RATE = 10
+DIAGNOSTICS_DIR = 'diagnostics'  # Compressed dumps go to <dir>/<spider>_<timestamp>/
+DIAGNOSTICS_QUEUE_SIZE = 100  # Dumps waiting to be written; more are dropped
+
+# Directory to record responses into for offline replay benchmarks, e.g.
+# scrapy crawl revibe -s FIXTURE_RECORD_DIR=benchmarks/fixtures/responses
+FIXTURE_RECORD_DIR = None
+
+# Persistent HTTP cache: product pages are reused for a while, listing pages
+# are always revalidated with If-None-Match/If-Modified-Since
+HTTPCACHE_ENABLED = True
+HTTPCACHE_DIR = 'httpcache'
+HTTPCACHE_STORAGE = 'electronics_scraper.httpcache.SqliteCacheStorage'
+HTTPCACHE_POLICY = 'electronics_scraper.httpcache.FreshnessPolicy'
+HTTPCACHE_ALWAYS_STORE = True  # Store pages without validators too; the policy decides freshness
+HTTPCACHE_PRODUCT_MAX_AGE_HOURS = 12
+HTTPCACHE_PRODUCT_CALLBACKS = ['parse_product']
+HTTPCACHE_ZSTD_LEVEL = 3
+
+# Deduplicate requests on canonical URLs (BaseSpider.canonical_url), so products
+# listed in several collections are fetched once. Product pages fetched in the
+# last SEEN_URLS_MAX_AGE_HOURS are skipped altogether; 0 only deduplicates within a run
+DUPEFILTER_CLASS = 'electronics_scraper.dupefilter.CanonicalDupeFilter'
+SEEN_URLS_DIR = 'seen_urls'  # One SQLite file per spider (under .scrapy/)
+SEEN_URLS_MAX_AGE_HOURS = 6
+
+EXTENSIONS = {
+    'scrapy.extensions.throttle.AutoThrottle': None,
+    'electronics_scraper.throttle.AdaptiveThrottle': 0,
+    'electronics_scraper.httpcache.HttpCacheStats': 500,
+    'electronics_scraper.metrics.MetricsExtension': 510,
+}
+
+# Time downloads, spider callbacks and pipeline stages into histograms (see
+# metrics.py), served on http://127.0.0.1:<port>/metrics and saved to
+# RESULTS_DIR as <spider>_<timestamp>_metrics.json; -s METRICS_ENABLED=true per run
+METRICS_ENABLED = False
+METRICS_PORT = [9410, 9430]  # First free port is used; [] disables the endpoint
+METRICS_HOST = '127.0.0.1'
+METRICS_SPIDER_METHODS = ['create_item']  # Timed besides the parse* callbacks
@@ -1,8 +1,38 @@
 """
 Spider for BackMarket electronics website.
 """
+from urllib.parse import urldefrag
+
 import scrapy
 from electronics_scraper.spiders.base_spider import BaseSpider
+from electronics_scraper.browser import BROWSER_SETTINGS, browser_meta
+
+# Selectors the rendered page is waited for, matching the parse fallbacks
+LISTING_READY_SELECTOR = 'a.productCard, a[data-test="product-thumb"], div.productCard a'
+PRODUCT_READY_SELECTOR = 'h1.title, h1[data-test="product-title"], h1.product-title'
+
+# Candidate keys for fields of products in the storefront's JSON API payloads
+TITLE_KEYS = ('title', 'title_model', 'productTitle', 'name', 'model')
+PRICE_KEYS = ('price', 'priceWithCurrency', 'price_amount', 'amount')
+GRADE_KEYS = ('grade', 'backbox_grade_label', 'gradeLabel', 'grade_name', 'condition')
+URL_KEYS = ('link_grade_v2', 'link', 'url', 'productUrl', 'href')
+IMAGE_KEYS = ('image', 'image1', 'imageUrl', 'picture')
+CATEGORY_KEYS = ('category', 'category_3', 'categoryName')
+OFFER_LIST_KEYS = ('offers', 'grades', 'variants')
+
+
+def _first(data, keys):
+    """First non-empty value of the given keys in a dict"""
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+
+def _page_key(url):
+    """Key captured payloads by page URL without fragment"""
+    return urldefrag(url)[0]
 
 
 class BackMarketSpider(BaseSpider):
@@ -10,6 +40,8 @@ class BackMarketSpider(BaseSpider):
     Spider for scraping electronics data from BackMarket.
     """
     name = "backmarket"
+    throttle_profile = "strict"
+    custom_settings = BROWSER_SETTINGS
     allowed_domains = ["backmarket.com"]
     start_urls = [
         "https://www.backmarket.com/en-us/l/iphone/e8724fea-197e-4815-85ce-21b8068020cc",
@@ -17,65 +49,221 @@ class BackMarketSpider(BaseSpider):
         "https://www.backmarket.com/en-us/l/google-pixel/5b368baa-338c-4f22-aa3e-6e95f39101dd",
         # Use fewer URLs during debugging to avoid getting blocked
     ]
+    # Read products from the listing pages' JSON API responses (-a capture_api=false to disable)
+    capture_api = True
+    selector_fields = {
+        'product_links': [
+            'a.productCard::attr(href)',
+            'a[data-test="product-thumb"]::attr(href)',
+            'div.productCard a::attr(href)',
+        ],
+        'name': [
+            'h1.title::text',
+            'h1[data-test="product-title"]::text',
+            'h1.product-title::text',
+        ],
+        'price': [
+            'div[data-qa="product-price"] span[data-test="prices-price"]::text',
+            'span[data-test="prices-price"]::text',
+            'div.price span::text',
+        ],
+        'image': [
+            'img.productImage::attr(src)',
+            'img.product-image::attr(src)',
+            'div.product-images img::attr(src)',
+        ],
+        'specs': [
+            'div.specs div.specsDetails ::text',
+            'div.product-specs ::text',
+            'div.product-details ::text',
+        ],
+        'category': [
+            'ol.productPathList li:nth-child(2) a::text',
+            'nav.breadcrumb li:nth-child(2) a::text',
+            'div.breadcrumbs a:nth-child(2)::text',
+        ],
+    }
+    # Currency of API prices that don't state one (the en-us storefront)
+    api_currency = "USD"
     
     def __init__(self, *args, **kwargs):
         super(BackMarketSpider, self).__init__(*args, **kwargs)
         self.website = "BackMarket"
+        self.api_payloads = {}  # Listing page URL -> JSON payloads captured while rendering
+    
+    @property
+    def capture_api_enabled(self):
+        """Whether listing pages should be read from captured API payloads"""
+        value = self.capture_api
+        if isinstance(value, str):
+            value = value.strip().lower() not in ('0', 'false', 'no', 'off')
+        return bool(value)
+    
+    def listing_meta(self):
+        """Request meta for rendering a listing page"""
+        if not self.capture_api_enabled:
+            return browser_meta(wait_for=LISTING_READY_SELECTOR)
+        # Capture on a fresh page so handlers don't pile up on pooled ones
+        return browser_meta(
+            wait_for=LISTING_READY_SELECTOR,
+            playwright_page_event_handlers={'response': 'capture_api_response'},
+            browser_reuse_page=False,
+        )
+    
+    async def capture_api_response(self, response):
+        """
+        Playwright response handler keeping the JSON payloads a listing page loads.
+        """
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if 'json' not in (response.headers.get('content-type') or ''):
+            return
+        try:
+            page_url = response.frame.page.url
+            payload = await response.json()
+        except Exception as e:
+            self.logger.debug(f"Could not read API response {response.url}: {e!r}")
+            return
+        self.api_payloads.setdefault(_page_key(page_url), []).append(payload)
     
     def start_requests(self):
         """
-        Start with just one URL and use playwright for JavaScript rendering.
+        Start with just one URL in debug mode and use playwright for JavaScript rendering.
         """
-        if self.debug_mode:
-            # In debug mode, just use the first URL
+        urls = self.start_urls[:1] if self.debug_mode else self.start_urls
+        for url in urls:
             yield scrapy.Request(
-                url=self.start_urls[0],
+                url=url,
                 callback=self.parse,
                 errback=self.handle_error,
-                meta={
-                    "playwright": True,  # Use Playwright for JavaScript rendering
-                    "playwright_include_page": True,  # Get access to the page object
-                }
+                meta=self.listing_meta(),
             )
-        else:
-            for url in self.start_urls:
-                yield scrapy.Request(
-                    url=url,
-                    callback=self.parse,
-                    errback=self.handle_error,
-                    meta={
-                        "playwright": True,
-                        "playwright_include_page": True,
-                    }
-                )
     
     async def parse(self, response):
         """
-        Parse the product listing page and follow links to product pages.
+        Parse the product listing page from its API payloads, or follow links
+        to product pages when none were captured.
         Using async for Playwright compatibility.
         """
         # Debug the response
         self.debug_response(response)
         
-        # Close the page once we're done with it
-        page = response.meta.get("playwright_page")
-        if page:
-            await page.close()
-        
         self.logger.info(f"Parsing BackMarket listing page: {response.url}")
         
-        # Extract product links with multiple selectors
-        product_links = []
+        # Items straight from the API payloads make product page renders unnecessary
+        api_items = list(self.items_from_payloads(self.api_payloads.pop(_page_key(response.url), []), response))
+        if api_items:
+            self.logger.info(f"Found {len(api_items)} offers in API payloads")
+            self.crawler.stats.inc_value('backmarket/api_items', len(api_items))
+            for item in api_items:
+                yield item
+        else:
+            if self.capture_api_enabled:
+                self.logger.info("No product data in API payloads, falling back to the DOM")
+                self.crawler.stats.inc_value('backmarket/dom_fallbacks')
+            for request in self.product_requests(response):
+                yield request
+            
+        # Follow pagination
+        next_page = response.css('a[data-qa="pagination-next-page"]::attr(href)').get()
+        if next_page and not self.debug_mode:  # Skip pagination in debug mode
+            next_page_url = response.urljoin(next_page)
+            self.logger.info(f"Following pagination to: {next_page_url}")
+            yield scrapy.Request(
+                url=next_page_url, 
+                callback=self.parse,
+                errback=self.handle_error,
+                meta=self.listing_meta(),
+            )
+    
+    def items_from_payloads(self, payloads, response):
+        """
+        Create items from the product data in captured API payloads.
+        
+        Every offer of a product, one per grade, becomes an item.
         
-        # Original selector
-        links1 = response.css('a.productCard::attr(href)').getall()
+        Args:
+            payloads (list): JSON payloads captured on the listing page
+            response (Response): The listing page response
+            
+        Yields:
+            ElectronicsItem: One item per offer
+        """
+        seen = set()
+        for payload in payloads:
+            for product in self._find_products(payload):
+                offers = _first(product, OFFER_LIST_KEYS)
+                if not isinstance(offers, list) or not all(isinstance(offer, dict) for offer in offers):
+                    offers = [{}]
+                for offer in offers:
+                    item = self._offer_item(product, offer, response)
+                    if item is None:
+                        continue
+                    key = (item['url'], item['name'], item.get('price'))
+                    if key not in seen:
+                        seen.add(key)
+                        yield item
+    
+    def _find_products(self, node):
+        """Walk a payload and yield the dicts that describe products"""
+        if isinstance(node, list):
+            for child in node:
+                yield from self._find_products(child)
+        elif isinstance(node, dict):
+            title = _first(node, TITLE_KEYS)
+            if isinstance(title, str) and (_first(node, PRICE_KEYS) is not None
+                                           or isinstance(_first(node, OFFER_LIST_KEYS), list)):
+                yield node
+                return
+            for child in node.values():
+                if isinstance(child, (list, dict)):
+                    yield from self._find_products(child)
+    
+    def _offer_item(self, product, offer, response):
+        """Create the item for one offer of a product, or None without a price"""
+        price = _first(offer, PRICE_KEYS) or _first(product, PRICE_KEYS)
+        currency = offer.get('currency') or product.get('currency')
+        if isinstance(price, dict):
+            currency = currency or price.get('currency')
+            price = price.get('amount') or price.get('value')
+        if price in (None, ''):
+            return None
+        
+        url = _first(offer, URL_KEYS) or _first(product, URL_KEYS)
+        if isinstance(url, dict):
+            url = url.get('href')
+        image = _first(product, IMAGE_KEYS)
+        if isinstance(image, dict):
+            image = image.get('src') or image.get('url')
+        category = _first(product, CATEGORY_KEYS)
         
-        # Alternative selectors
-        links2 = response.css('a[data-test="product-thumb"]::attr(href)').getall()
-        links3 = response.css('div.productCard a::attr(href)').getall()
+        title = _first(product, TITLE_KEYS).strip()
+        grade = _first(offer, GRADE_KEYS) or _first(product, GRADE_KEYS)
+        if isinstance(grade, dict):
+            grade = grade.get('name') or grade.get('label')
+        name = f"{title} - {grade}" if isinstance(grade, str) and grade else title
         
-        # Combine all links
-        product_links = list(set(links1 + links2 + links3))
+        specs = _first(product, ('specs', 'sub_title_elements', 'description'))
+        specs_text = ' '.join(str(value) for value in specs) if isinstance(specs, list) else str(specs or '')
+        
+        if currency is None and isinstance(price, str):
+            currency = self.extract_currency(price)
+        return self.create_item(
+            name=name,
+            price=price,
+            url=response.urljoin(url) if url else response.url,
+            specs_text=f"{name} {specs_text}",
+            currency=currency or self.api_currency,
+            category=category if isinstance(category, str) else None,
+            image_url=image if isinstance(image, str) else None,
+        )
+    
+    def product_requests(self, response):
+        """
+        Requests for the product pages linked from a rendered listing page.
+        """
+        # Extract product links, trying the selector that worked last first
+        product_links = list(dict.fromkeys(self.selectors.getall(response, 'product_links')))
         
         self.logger.info(f"Found {len(product_links)} product links")
         
@@ -92,30 +280,13 @@ class BackMarketSpider(BaseSpider):
                 url=full_url, 
                 callback=self.parse_product,
                 errback=self.handle_error,
-                meta={
-                    "playwright": True,
-                }
+                meta=browser_meta(wait_for=PRODUCT_READY_SELECTOR),
             )
             
             count += 1
             if self.debug_mode and count >= 3:
                 self.logger.info("Debug mode: limiting to 3 product pages")
                 break
-            
-        # Follow pagination
-        next_page = response.css('a[data-qa="pagination-next-page"]::attr(href)').get()
-        if next_page and not self.debug_mode:  # Skip pagination in debug mode
-            next_page_url = response.urljoin(next_page)
-            self.logger.info(f"Following pagination to: {next_page_url}")
-            yield scrapy.Request(
-                url=next_page_url, 
-                callback=self.parse,
-                errback=self.handle_error,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                }
-            )
     
     def parse_product(self, response):
         """
@@ -123,61 +294,12 @@ class BackMarketSpider(BaseSpider):
         """
         self.logger.info(f"Parsing BackMarket product: {response.url}")
         
-        # Try multiple different CSS selectors since the site might change
-        name = None
-        for selector in [
-            'h1.title::text',
-            'h1[data-test="product-title"]::text',
-            'h1.product-title::text'
-        ]:
-            name = response.css(selector).get()
-            if name:
-                break
-                
-        price_str = None
-        for selector in [
-            'div[data-qa="product-price"] span[data-test="prices-price"]::text',
-            'span[data-test="prices-price"]::text',
-            'div.price span::text'
-        ]:
-            price_str = response.css(selector).get()
-            if price_str:
-                break
-                
-        image_url = None
-        for selector in [
-            'img.productImage::attr(src)',
-            'img.product-image::attr(src)',
-            'div.product-images img::attr(src)'
-        ]:
-            image_url = response.css(selector).get()
-            if image_url:
-                break
-                
-        # Extract specifications 
-        specs_selectors = [
-            'div.specs div.specsDetails ::text',
-            'div.product-specs ::text', 
-            'div.product-details ::text'
-        ]
-        
-        specs_text = ""
-        for selector in specs_selectors:
-            specs = response.css(selector).getall()
-            if specs:
-                specs_text = ' '.join(specs)
-                break
-        
-        # Extract category from breadcrumbs
-        category = None
-        for selector in [
-            'ol.productPathList li:nth-child(2) a::text',
-            'nav.breadcrumb li:nth-child(2) a::text',
-            'div.breadcrumbs a:nth-child(2)::text'
-        ]:
-            category = response.css(selector).get()
-            if category:
-                break
+        # Candidates are tried starting with the one that matched last
+        name = self.selectors.get(response, 'name')
+        price_str = self.selectors.get(response, 'price')
+        image_url = self.selectors.get(response, 'image')
+        specs_text = ' '.join(self.selectors.getall(response, 'specs'))
+        category = self.selectors.get(response, 'category')
         
         # Debug output
         self.logger.info(f"Extracted name: {name}")
@@ -199,20 +321,7 @@ class BackMarketSpider(BaseSpider):
             )
         else:
             self.logger.warning(f"Could not extract essential data from {response.url}")
-    
-    def handle_error(self, failure):
-        """
-        Handle request errors.
-        """
-        self.logger.error(f"Request failed: {failure.request.url}")
-        self.logger.error(f"Error: {repr(failure)}")
-        
-        # Save the error response if available
-        if hasattr(failure.value, 'response') and failure.value.response:
-            filename = f"error_{self.name}_{failure.value.response.status}.html"
-            with open(filename, 'wb') as f:
-                f.write(failure.value.response.body)
-            self.logger.info(f"Saved error response to {filename}")
+            self.diagnostics.record('extraction', response)
     
     def test_backmarket_structure(self, response):
         """
@@ -1,10 +1,20 @@
 """
 Base spider class with common functionality for all electronics spiders.
 """
+import os
 import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import scrapy
+from scrapy.utils.project import data_path
+from w3lib.url import canonicalize_url
 from electronics_scraper.items import ElectronicsItem
 from electronics_scraper.utils.normalizer import extract_specs
+from electronics_scraper.utils.currency import get_rate_provider
+from electronics_scraper.throttle import throttle_settings
+from electronics_scraper.utils.selector_cache import SelectorResolver
+from electronics_scraper.utils.diagnostics import Diagnostics, parse_bool
+from electronics_scraper.runner import parse_shard
+from electronics_scraper.metrics import get_metrics
 
 
 class BaseSpider(scrapy.Spider):
@@ -16,11 +26,103 @@ class BaseSpider(scrapy.Spider):
     name = "base"
     allowed_domains = []
     start_urls = []
+    # Throttle profile name (see throttle.THROTTLE_PROFILES) or a dict of overrides
+    throttle_profile = "default"
+    # Field name -> ordered candidate CSS selectors, resolved with self.selectors
+    selector_fields = {}
+    # (compiled pattern, replacement) pairs mapping URL paths to their canonical form
+    canonical_path_rewrites = []
+    # Query parameters that don't change the page, dropped by canonical_url (plus utm_*)
+    tracking_query_params = frozenset(['ref', 'gclid', 'fbclid', '_pos', '_sid', '_ss', '_fid', '_psq'])
+    
+    @classmethod
+    def update_settings(cls, settings):
+        """
+        Apply the spider's throttle profile; custom_settings still take precedence.
+        """
+        # -s THROTTLE_PROFILE=<name> forces a profile from the command line
+        profile = settings.get('THROTTLE_PROFILE') or cls.throttle_profile
+        _, shards = parse_shard(settings.get('CRAWL_SHARD'))
+        settings.setdict(throttle_settings(profile, settings, shards=shards), priority='spider')
+        super(BaseSpider, cls).update_settings(settings)
+    
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(BaseSpider, cls).from_crawler(crawler, *args, **kwargs)
+        # -s CRAWL_SHARD=i/n crawls every nth start URL from the ith (see runner.py)
+        index, count = parse_shard(crawler.settings.get('CRAWL_SHARD'))
+        if count > 1:
+            spider.start_urls = spider.start_urls[index::count]
+        return spider
+    
+    def canonical_url(self, url):
+        """
+        Canonical form of a URL, used by the dupefilter (see dupefilter.py).
+        
+        Applies canonical_path_rewrites to the path, drops tracking query
+        parameters and the fragment, and sorts the remaining parameters.
+        """
+        parts = urlsplit(url)
+        path = parts.path
+        for pattern, replacement in self.canonical_path_rewrites:
+            path = pattern.sub(replacement, path)
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                 if key not in self.tracking_query_params and not key.startswith('utm_')]
+        return canonicalize_url(urlunsplit((parts.scheme, parts.netloc.lower(), path, urlencode(query), '')))
     
     def __init__(self, *args, **kwargs):
         super(BaseSpider, self).__init__(*args, **kwargs)
         self.website = None  # Override in child classes
-        self.debug_mode = kwargs.get('debug', True)  # Enable debugging by default
+        # -a debug=true limits the crawl and runs selector tests on failing pages
+        self.debug_mode = parse_bool(kwargs.get('debug'), default=False)
+        # -a diagnostics=off|counters|sample|full overrides DIAGNOSTICS_LEVEL
+        self.diagnostics_level = kwargs.get('diagnostics', 'full' if self.debug_mode else None)
+        self.rate_provider = get_rate_provider()  # Shared with the pipeline
+        self._selectors = None
+        self._diagnostics = None
+    
+    @property
+    def selectors(self):
+        """
+        Resolver for selector_fields that tries the last winning selector first.
+        
+        Created on first use, once the crawler settings are available.
+        """
+        if self._selectors is None:
+            crawler = getattr(self, 'crawler', None)
+            cache_file = None
+            if crawler is not None and crawler.settings.get('SELECTOR_CACHE_DIR'):
+                cache_dir = data_path(crawler.settings.get('SELECTOR_CACHE_DIR'), createdir=True)
+                cache_file = os.path.join(cache_dir, f"{self.name}.json")
+            self._selectors = SelectorResolver(
+                self.selector_fields,
+                cache_file=cache_file,
+                stats=crawler.stats if crawler is not None else None,
+            )
+        return self._selectors
+    
+    @property
+    def diagnostics(self):
+        """
+        Failure recorder at the configured diagnostics level.
+        
+        Created on first use, once the crawler settings are available.
+        """
+        if self._diagnostics is None:
+            crawler = getattr(self, 'crawler', None)
+            if crawler is not None:
+                self._diagnostics = Diagnostics.from_settings(
+                    self.name, crawler.settings, stats=crawler.stats, level=self.diagnostics_level)
+            else:
+                self._diagnostics = Diagnostics(self.name)
+        return self._diagnostics
+    
+    def closed(self, reason):
+        """Persist the selectors that worked in this run and flush diagnostic dumps"""
+        if self._selectors is not None:
+            self._selectors.save()
+        if self._diagnostics is not None:
+            self._diagnostics.close()
     
     def parse(self, response):
         """
@@ -32,23 +134,29 @@ class BaseSpider(scrapy.Spider):
     
     def debug_response(self, response):
         """
-        Debug the response to identify issues with selectors.
+        Record non-200 responses so selector issues can be investigated.
         """
-        self.logger.info(f"Status code: {response.status} for URL: {response.url}")
-        
         if response.status != 200:
             self.logger.error(f"Failed to fetch page: {response.url}, Status: {response.status}")
-            
             # Log headers for debugging
             self.logger.debug(f"Response Headers: {response.headers}")
-            
-            # Save the response body for inspection
-            filename = f"debug_{self.name}_{response.status}.html"
-            with open(filename, 'wb') as f:
-                f.write(response.body)
-            self.logger.info(f"Saved response body to {filename}")
+            self.diagnostics.record('http_error', response)
+        else:
+            self.logger.debug(f"Successfully fetched page: {response.url}")
+    
+    def handle_error(self, failure):
+        """
+        Handle request errors.
+        """
+        self.logger.error(f"Request failed: {failure.request.url}")
+        self.logger.error(f"Error: {repr(failure)}")
+        
+        # Keep the error response, if any, for inspection
+        response = getattr(failure.value, 'response', None)
+        if response is not None:
+            self.diagnostics.record('request_failed', response)
         else:
-            self.logger.info(f"Successfully fetched page: {response.url}")
+            self.diagnostics.record('request_failed', url=failure.request.url)
     
     def extract_price(self, price_str):
         """
@@ -136,7 +244,10 @@ class BaseSpider(scrapy.Spider):
         if isinstance(price, str):
             price = self.extract_price(price)
         
-        specs = extract_specs(specs_text) if specs_text else {}
+        specs = {}
+        if specs_text:
+            with get_metrics().timer('spider.extract_specs'):
+                specs = extract_specs(specs_text)
         
         item = ElectronicsItem(
             name=name,
@@ -19,6 +19,33 @@ class BobShopSpider(BaseSpider):
         "https://www.bobshop.co.za/cell-phones-accessories/smart-watch-accessories/c/18113",
         "https://www.bobshop.co.za/gaming/consoles/c/10123",
     ]
+    selector_fields = {
+        'product_links': [
+            'div.product-item a.product-item__title::attr(href)',
+            'div.product-item a.thumb::attr(href)',
+            'div.product-item a[href*="/product/"]::attr(href)',
+        ],
+        'next_page': [
+            'a.pagination__next::attr(href)',
+            'li.pagination-next a::attr(href)',
+            'a[rel="next"]::attr(href)',
+        ],
+        'name': [
+            'h1.product-single__title::text',
+            'h1::text',
+            '.product-single__title::text',
+            '.product-title::text',
+        ],
+        'price': [
+            'span.product__price::text',
+            '.price::text',
+            '.product-price::text',
+            '.current-price::text',
+        ],
+        'image': ['img.product-featured-media::attr(src)'],
+        'specs': ['div.product-single__description ::text'],
+        'category': ['nav.breadcrumb li:nth-child(2) a::text'],
+    }
     
     def __init__(self, *args, **kwargs):
         super(BobShopSpider, self).__init__(*args, **kwargs)
@@ -43,13 +70,6 @@ class BobShopSpider(BaseSpider):
                     errback=self.handle_error
                 )
     
-    def handle_error(self, failure):
-        """
-        Handle request errors.
-        """
-        self.logger.error(f"Request failed: {failure.request.url}")
-        self.logger.error(f"Error: {repr(failure)}")
-    
     def parse(self, response):
         """
         Parse the product listing page and follow links to product pages.
@@ -60,18 +80,8 @@ class BobShopSpider(BaseSpider):
         
         self.logger.info(f"Parsing listing page: {response.url}")
         
-        # Extract product links - use multiple selectors for better chance of finding products
-        product_links = []
-        
-        # Original selector
-        links1 = response.css('div.product-item a.product-item__title::attr(href)').getall()
-        
-        # Alternative selectors
-        links2 = response.css('div.product-item a.thumb::attr(href)').getall()
-        links3 = response.css('div.product-item a[href*="/product/"]::attr(href)').getall()
-        
-        # Combine and deduplicate
-        product_links = list(set(links1 + links2 + links3))
+        # Extract product links, trying the selector that worked last first
+        product_links = list(dict.fromkeys(self.selectors.getall(response, 'product_links')))
         
         self.logger.info(f"Found {len(product_links)} product links")
         
@@ -89,17 +99,9 @@ class BobShopSpider(BaseSpider):
                 errback=self.handle_error
             )
             
-        # Follow pagination - try multiple selectors
-        next_page = None
-        for selector in [
-            'a.pagination__next::attr(href)',
-            'li.pagination-next a::attr(href)',
-            'a[rel="next"]::attr(href)'
-        ]:
-            next_page = response.css(selector).get()
-            if next_page:
-                break
-                
+        # Follow pagination
+        next_page = self.selectors.get(response, 'next_page')
+
         if next_page:
             next_page_url = response.urljoin(next_page)
             self.logger.info(f"Following pagination to: {next_page_url}")
@@ -117,29 +119,11 @@ class BobShopSpider(BaseSpider):
         """
         self.logger.info(f"Parsing product page: {response.url}")
         
-        # First try the original selectors
-        name = response.css('h1.product-single__title::text').get()
-        price_str = response.css('span.product__price::text').get()
-        image_url = response.css('img.product-featured-media::attr(src)').get()
-        specs_text = ' '.join(response.css('div.product-single__description ::text').getall())
-        category = response.css('nav.breadcrumb li:nth-child(2) a::text').get()
-        
-        # If primary selectors fail, try alternatives
-        if not name:
-            self.logger.warning("Primary name selector failed, trying alternatives")
-            for selector in ['h1::text', '.product-single__title::text', '.product-title::text']:
-                name = response.css(selector).get()
-                if name:
-                    self.logger.info(f"Found name with selector: {selector}")
-                    break
-                    
-        if not price_str:
-            self.logger.warning("Primary price selector failed, trying alternatives")
-            for selector in ['.price::text', '.product-price::text', '.current-price::text']:
-                price_str = response.css(selector).get()
-                if price_str:
-                    self.logger.info(f"Found price with selector: {selector}")
-                    break
+        name = self.selectors.get(response, 'name')
+        price_str = self.selectors.get(response, 'price')
+        image_url = self.selectors.get(response, 'image')
+        specs_text = ' '.join(self.selectors.getall(response, 'specs'))
+        category = self.selectors.get(response, 'category')
         
         # Debug output
         self.logger.info(f"Extracted name: {name}")
@@ -161,6 +145,7 @@ class BobShopSpider(BaseSpider):
             )
         else:
             self.logger.warning(f"Insufficient data extracted from {response.url}")
+            self.diagnostics.record('extraction', response)
             
     def test_listing_selectors(self, response):
         """
@@ -3,13 +3,15 @@ Spider for Gorilla Phones electronics website.
 """
 import scrapy
 from electronics_scraper.spiders.base_spider import BaseSpider
+from electronics_scraper.spiders.shopify import ShopifyProductsJsonMixin
 
 
-class GorillaPhoneSpider(BaseSpider):
+class GorillaPhoneSpider(ShopifyProductsJsonMixin, BaseSpider):
     """
     Spider for scraping electronics data from Gorilla Phones.
     """
     name = "gorilla"
+    throttle_profile = "shopify"
     allowed_domains = ["gorillaphones.co.za"]
     start_urls = [
         "https://www.gorillaphones.co.za/collections/iphones",
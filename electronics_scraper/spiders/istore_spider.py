@@ -3,19 +3,21 @@ Spider for iStore Pre-owned electronics website.
 """
 import scrapy
 from electronics_scraper.spiders.base_spider import BaseSpider
+from electronics_scraper.spiders.shopify import ShopifyProductsJsonMixin
 
 
-class IStorePreOwnedSpider(BaseSpider):
+class IStorePreOwnedSpider(ShopifyProductsJsonMixin, BaseSpider):
     """
     Spider for scraping electronics data from iStore Pre-owned section.
     """
     name = "istore"
-    allowed_domains = ["istore.co.za"]
+    throttle_profile = "shopify"
+    allowed_domains = ["istore.co.za", "istorepreowned.co.za"]
     start_urls = [
         "https://istorepreowned.co.za/collections/iphone-savings",
         "https://istorepreowned.co.za/collections/iphone",
         "https://istorepreowned.co.za/collections/ipad",
-        "https://istorepreowned.co.za/collections/mac"
+        "https://istorepreowned.co.za/collections/mac",
         "https://istorepreowned.co.za/collections/apple-watch",
         "https://istorepreowned.co.za/collections/accessories-2",
     ]
@@ -3,13 +3,15 @@ Spider for Revibe electronics website.
 """
 import scrapy
 from electronics_scraper.spiders.base_spider import BaseSpider
+from electronics_scraper.spiders.shopify import ShopifyProductsJsonMixin
 
 
-class RevibeSpider(BaseSpider):
+class RevibeSpider(ShopifyProductsJsonMixin, BaseSpider):
     """
     Spider for scraping electronics data from Revibe.
     """
     name = "revibe"
+    throttle_profile = "shopify"
     allowed_domains = ["revibe.co.za"]
     start_urls = [
         "https://revibe.co.za/collections/refurbished-iphones",
@@ -0,0 +1,150 @@
+"""
+Shared bulk-fetch support for spiders crawling Shopify storefronts.
+"""
+import re
+import json
+from urllib.parse import urlsplit
+
+import scrapy
+from w3lib.html import remove_tags
+
+
+class ShopifyProductsJsonMixin:
+    """
+    Crawl Shopify collections through their products.json endpoint.
+
+    Each ``/collections/<handle>`` start URL is fetched as
+    ``/collections/<handle>/products.json?limit=250&page=N``, which returns
+    up to 250 products with variants and prices per request, and one item
+    is emitted per variant. The spider's HTML ``parse`` path is used when
+    the endpoint is disabled, with ``-a products_json=false`` or the
+    SHOPIFY_PRODUCTS_JSON setting, or when a store doesn't serve it.
+
+    Mix in before BaseSpider.
+    """
+
+    products_json = True
+    products_json_limit = 250
+    # Products are listed under every collection they're in, but served from /products/<handle>
+    canonical_path_rewrites = [(re.compile(r'^/collections/[^/]+/products/'), '/products/')]
+
+    @property
+    def products_json_enabled(self):
+        """Whether collections should be fetched via products.json"""
+        value = self.products_json
+        if isinstance(value, str):
+            value = value.strip().lower() not in ('0', 'false', 'no', 'off')
+        settings = getattr(self, 'settings', None)
+        if settings is not None and not settings.getbool('SHOPIFY_PRODUCTS_JSON', True):
+            return False
+        return bool(value)
+
+    def start_requests(self):
+        """
+        Request each collection via products.json, or its HTML page when disabled.
+        """
+        for url in self.start_urls:
+            if self.products_json_enabled and self.collection_handle(url):
+                yield self.products_json_request(url, page=1)
+            else:
+                yield scrapy.Request(url=url, callback=self.parse, dont_filter=True)
+
+    @staticmethod
+    def collection_handle(url):
+        """Return the collection handle of a /collections/<handle> URL, or None"""
+        parts = urlsplit(url).path.strip('/').split('/')
+        if len(parts) >= 2 and parts[0] == 'collections':
+            return parts[1]
+        return None
+
+    def products_json_request(self, collection_url, page):
+        """Build the products.json request for one page of a collection"""
+        parts = urlsplit(collection_url)
+        url = (f"{parts.scheme}://{parts.netloc}/collections/{self.collection_handle(collection_url)}"
+               f"/products.json?limit={self.products_json_limit}&page={page}")
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_products_json,
+            errback=self.products_json_failed,
+            meta={'collection_url': collection_url, 'products_json_page': page},
+        )
+
+    def parse_products_json(self, response):
+        """
+        Emit one item per product variant and request the next page.
+        """
+        collection_url = response.meta['collection_url']
+        try:
+            products = json.loads(response.text)['products']
+        except (ValueError, KeyError, TypeError):
+            self.logger.warning(f"No products.json data at {response.url}, falling back to HTML")
+            yield scrapy.Request(url=collection_url, callback=self.parse, dont_filter=True)
+            return
+
+        self.logger.info(f"Found {len(products)} products in {response.url}")
+
+        for product in products:
+            yield from self.parse_shopify_product(product, collection_url)
+
+        if len(products) >= self.products_json_limit:
+            yield self.products_json_request(collection_url, response.meta['products_json_page'] + 1)
+
+    def products_json_failed(self, failure):
+        """
+        Fall back to the HTML collection page when products.json can't be fetched.
+        """
+        collection_url = failure.request.meta['collection_url']
+        self.logger.warning(f"products.json request failed for {collection_url}: {failure.value!r}, "
+                            f"falling back to HTML")
+        # Only the first page falls back; later pages were already covered by JSON
+        if failure.request.meta.get('products_json_page') == 1:
+            yield scrapy.Request(url=collection_url, callback=self.parse, dont_filter=True)
+
+    def parse_shopify_product(self, product, collection_url):
+        """
+        Create an item for each variant of a products.json product.
+
+        Products already emitted from another collection in this run are skipped.
+
+        Args:
+            product (dict): Product object from products.json
+            collection_url (str): Collection the product was listed in
+
+        Yields:
+            ElectronicsItem: One item per variant
+        """
+        parts = urlsplit(collection_url)
+        product_url = f"{parts.scheme}://{parts.netloc}/products/{product.get('handle')}"
+        if not hasattr(self, '_products_seen'):
+            self._products_seen = set()
+        if product_url in self._products_seen:
+            if getattr(self, 'crawler', None) is not None:
+                self.crawler.stats.inc_value('shopify/duplicate_products')
+            return
+        self._products_seen.add(product_url)
+        title = (product.get('title') or '').strip()
+
+        images = product.get('images') or []
+        default_image = images[0].get('src') if images else None
+
+        description = remove_tags(product.get('body_html') or '')
+        category = product.get('product_type') or self.collection_handle(collection_url).replace('-', ' ')
+
+        for variant in product.get('variants') or []:
+            variant_title = variant.get('title')
+            name = title if variant_title in (None, '', 'Default Title') else f"{title} - {variant_title}"
+
+            price = variant.get('price')
+            options = ' '.join(str(variant.get(key)) for key in ('option1', 'option2', 'option3')
+                               if variant.get(key))
+            image = variant.get('featured_image') or {}
+
+            yield self.create_item(
+                name=name,
+                price=float(price) if price else None,
+                url=f"{product_url}?variant={variant.get('id')}",
+                specs_text=f"{name} {options} {description}",
+                currency="ZAR",
+                category=category,
+                image_url=image.get('src') or default_image,
+            )
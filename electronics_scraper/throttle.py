@@ -0,0 +1,143 @@
+"""
+Per-spider throttle profiles and adaptive per-domain delay control.
+"""
+import logging
+
+from scrapy.extensions.throttle import AutoThrottle
+
+# Crawl-rate settings applied per spider through BaseSpider.throttle_profile
+THROTTLE_PROFILES = {
+    # Shopify storefronts tolerate parallel requests well
+    'shopify': {
+        'DOWNLOAD_DELAY': 0.5,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+        'AUTOTHROTTLE_START_DELAY': 1.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        'AUTOTHROTTLE_MAX_DELAY': 20.0,
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': 4,
+    },
+    'default': {
+        'DOWNLOAD_DELAY': 2.0,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        'AUTOTHROTTLE_START_DELAY': 2.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 2.0,
+        'AUTOTHROTTLE_MAX_DELAY': 30.0,
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': 2,
+    },
+    # Sites that block aggressively and need proxies or a browser
+    'strict': {
+        'DOWNLOAD_DELAY': 5.0,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 2,
+        'AUTOTHROTTLE_START_DELAY': 5.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'AUTOTHROTTLE_MAX_DELAY': 60.0,
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': 1,
+    },
+}
+
+
+def throttle_settings(profile, settings=None, shards=1):
+    """
+    Resolve a throttle profile to a settings dict.
+
+    Args:
+        profile (str or dict): Profile name, or a dict of settings. A dict
+            may name a base profile under the ``'profile'`` key and override
+            individual settings.
+        settings (Settings): Project settings; THROTTLE_PROFILES there
+            overrides or extends the built-in profiles
+        shards (int): Processes crawling the same domains in parallel; the
+            per-domain concurrency is split between them and delays scaled up
+
+    Returns:
+        dict: Settings to apply at spider priority
+    """
+    profiles = {name: dict(values) for name, values in THROTTLE_PROFILES.items()}
+    if settings is not None:
+        for name, values in settings.getdict('THROTTLE_PROFILES').items():
+            profiles.setdefault(name, {}).update(values)
+
+    overrides = {}
+    if isinstance(profile, dict):
+        overrides = {key: value for key, value in profile.items() if key != 'profile'}
+        profile = profile.get('profile', 'default')
+
+    if profile not in profiles:
+        raise ValueError(f"Unknown throttle profile {profile!r}, expected one of {sorted(profiles)}")
+
+    resolved = dict(profiles[profile])
+    resolved.update(overrides)
+    if shards > 1:
+        for key in ('CONCURRENT_REQUESTS_PER_DOMAIN', 'AUTOTHROTTLE_TARGET_CONCURRENCY'):
+            if key in resolved:
+                resolved[key] = max(type(resolved[key])(resolved[key] / shards), 1)
+        for key in ('DOWNLOAD_DELAY', 'AUTOTHROTTLE_START_DELAY'):
+            if key in resolved:
+                resolved[key] = resolved[key] * shards
+    return resolved
+
+
+class AdaptiveThrottle(AutoThrottle):
+    """
+    AutoThrottle that also backs off when a domain pushes back.
+
+    Latency-based tuning works as in the stock extension, within the
+    spider's profile limits. A 429 or 503 response multiplies the domain's
+    delay by THROTTLE_BACKOFF_FACTOR, honouring Retry-After, and the
+    backed-off delay is kept as a floor that decays by
+    THROTTLE_RECOVERY_FACTOR with every successful response.
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        settings = crawler.settings
+        self.backoff_statuses = set(settings.getlist('THROTTLE_BACKOFF_HTTP_CODES', [429, 503]))
+        self.backoff_factor = settings.getfloat('THROTTLE_BACKOFF_FACTOR', 2.0)
+        self.recovery_factor = settings.getfloat('THROTTLE_RECOVERY_FACTOR', 0.9)
+        self.stats = crawler.stats
+        self.floors = {}  # Slot key -> delay floor left by the last back-off
+        self.logger = logging.getLogger(__name__)
+
+    def _response_downloaded(self, response, request, spider):
+        key, slot = self._get_slot(request, spider)
+        if slot is None:
+            return
+
+        if response.status in self.backoff_statuses:
+            self._back_off(key, slot, response)
+            return
+
+        super()._response_downloaded(response, request, spider)
+
+        floor = self.floors.get(key)
+        if floor:
+            slot.delay = max(slot.delay, floor)
+            floor *= self.recovery_factor
+            if floor <= self.mindelay:
+                del self.floors[key]
+            else:
+                self.floors[key] = floor
+
+    def _back_off(self, key, slot, response):
+        """Increase a slot's delay after the server pushed back"""
+        new_delay = max(slot.delay * self.backoff_factor, self.mindelay, 1.0, self._retry_after(response))
+        new_delay = min(new_delay, self.maxdelay)
+
+        self.logger.info(f"Got {response.status} from {key}, raising delay "
+                         f"from {slot.delay:.2f}s to {new_delay:.2f}s")
+        slot.delay = new_delay
+        self.floors[key] = new_delay
+
+        self.stats.inc_value('throttle/backoff')
+        self.stats.inc_value(f'throttle/backoff/{response.status}')
+        self.stats.max_value('throttle/max_delay', new_delay)
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds requested by a Retry-After header, or 0"""
+        value = response.headers.get('Retry-After')
+        try:
+            return float(value) if value else 0.0
+        except ValueError:
+            # HTTP-date values aren't worth parsing here; the multiplier still applies
+            return 0.0
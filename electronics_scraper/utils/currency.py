@@ -4,7 +4,8 @@ Utilities for currency conversion and price handling.
 import logging
 import os
 import json
-import requests
+import threading
+import time
 from datetime import datetime, timedelta
 
 # Default exchange rates (in case API is unavailable)
@@ -16,47 +17,53 @@ DEFAULT_EXCHANGE_RATES = {
 }
 
 # Path to cached exchange rates
-CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
                          'data', 'exchange_rates.json')
 
+# How long rates are considered fresh, both on disk and in memory
+RATES_TTL = timedelta(hours=24)
 
-def get_exchange_rates():
+
+def _read_cached_rates(cache_file=CACHE_FILE):
     """
-    Get current exchange rates from API or cache.
-    
+    Read exchange rates from the on-disk cache.
+
     Returns:
-        dict: Exchange rates with ZAR as base currency
+        tuple: (rates, cache_time), or (None, None) if there is no usable cache
     """
-    # Create data directory if it doesn't exist
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    
-    # Check if we have cached rates less than 24 hours old
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                data = json.load(f)
-                
-            # Check if cache is still valid (less than 24 hours old)
-            cache_time = datetime.fromisoformat(data['timestamp'])
-            if datetime.now() - cache_time < timedelta(hours=24):
-                logging.info("Using cached exchange rates")
-                return data['rates']
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logging.warning(f"Error reading cached exchange rates: {e}")
-    
-    # Try to get fresh rates from API
+    if not os.path.exists(cache_file):
+        return None, None
+
     try:
-        # You would need to sign up for a free API key at exchangerate-api.com 
+        with open(cache_file, 'r') as f:
+            data = json.load(f)
+        return data['rates'], datetime.fromisoformat(data['timestamp'])
+    except (json.JSONDecodeError, KeyError, ValueError) as e:
+        logging.warning(f"Error reading cached exchange rates: {e}")
+        return None, None
+
+
+def _fetch_rates(cache_file=CACHE_FILE):
+    """
+    Fetch fresh exchange rates from the API and write them to the cache.
+
+    Returns:
+        dict: Exchange rates with ZAR as base currency, or None on failure
+    """
+    try:
+        # You would need to sign up for a free API key at exchangerate-api.com
         # or a similar service
         API_KEY = os.environ.get('EXCHANGE_RATE_API_KEY', '')
         if not API_KEY:
             logging.warning("No API key for exchange rates, using default values")
-            return DEFAULT_EXCHANGE_RATES
-            
+            return None
+
+        import requests
+
         url = f"https://v6.exchangerate-api.com/v6/{API_KEY}/latest/ZAR"
         response = requests.get(url, timeout=10)
         data = response.json()
-        
+
         if data['result'] == 'success':
             # Convert to ZAR-based rates (invert because API gives rates for converting from ZAR)
             rates = {
@@ -65,43 +72,213 @@ def get_exchange_rates():
                 'EUR': 1.0 / data['conversion_rates']['EUR'],
                 'GBP': 1.0 / data['conversion_rates']['GBP']
             }
-            
+
             # Cache the rates
-            with open(CACHE_FILE, 'w') as f:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, 'w') as f:
                 json.dump({
                     'timestamp': datetime.now().isoformat(),
                     'rates': rates
                 }, f, indent=2)
-                
+
             logging.info("Updated exchange rates from API")
             return rates
     except Exception as e:
         logging.error(f"Error fetching exchange rates: {e}")
-    
+
+    return None
+
+
+def get_exchange_rates():
+    """
+    Get current exchange rates from API or cache.
+
+    This always goes to disk (and possibly the network); item processing
+    should use the shared ExchangeRateProvider instead.
+
+    Returns:
+        dict: Exchange rates with ZAR as base currency
+    """
+    # Check if we have cached rates less than 24 hours old
+    rates, cache_time = _read_cached_rates()
+    if rates is not None and datetime.now() - cache_time < RATES_TTL:
+        logging.info("Using cached exchange rates")
+        return rates
+
+    # Try to get fresh rates from API
+    rates = _fetch_rates()
+    if rates is not None:
+        return rates
+
     # If all else fails, use default rates
     logging.warning("Using default exchange rates")
     return DEFAULT_EXCHANGE_RATES
 
 
+class ExchangeRateProvider:
+    """
+    Process-wide, in-memory exchange rate cache.
+
+    Rates are loaded once from the on-disk cache (or the defaults) and kept
+    in memory for ``ttl``. When they expire, a refresh is started on a
+    background thread and the previous rates keep being served until it
+    completes, so callers on the reactor thread never wait on the network.
+    """
+
+    def __init__(self, ttl=RATES_TTL, cache_file=CACHE_FILE):
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
+        self._rates = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def get_rates(self):
+        """
+        Get the current exchange rates.
+
+        Returns:
+            dict: Exchange rates with ZAR as base currency
+        """
+        if self._rates is None:
+            self._load()
+        elif time.monotonic() >= self._expires_at:
+            self.refresh_async()
+        return self._rates
+
+    def get_rate(self, currency):
+        """
+        Get the ZAR rate for a single currency code (1.0 if unknown).
+        """
+        return self.get_rates().get(currency.upper(), 1.0)
+
+    def _load(self):
+        """Load rates from the disk cache, falling back to the defaults."""
+        with self._lock:
+            if self._rates is not None:
+                return
+
+            rates, cache_time = _read_cached_rates(self.cache_file)
+            if rates is None:
+                self._set_rates(DEFAULT_EXCHANGE_RATES, fresh_for=0.0)
+            else:
+                age = (datetime.now() - cache_time).total_seconds()
+                self._set_rates(rates, fresh_for=self.ttl - max(age, 0.0))
+
+        if time.monotonic() >= self._expires_at:
+            self.refresh_async()
+
+    def _set_rates(self, rates, fresh_for=None):
+        self._rates = dict(rates)
+        if fresh_for is None:
+            fresh_for = self.ttl
+        self._expires_at = time.monotonic() + fresh_for
+
+    def refresh_async(self):
+        """
+        Refresh the rates on a background thread unless a refresh is running.
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            # Push expiry out so a failing API isn't retried on every item
+            self._expires_at = time.monotonic() + self.ttl
+            self._refresh_thread = threading.Thread(
+                target=self._refresh, name="exchange-rate-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _refresh(self):
+        rates = _fetch_rates(self.cache_file)
+        if rates is not None:
+            with self._lock:
+                self._set_rates(rates)
+            self.logger.info("Refreshed in-memory exchange rates")
+
+    def convert(self, price, currency='ZAR'):
+        """
+        Convert a single price to ZAR.
+
+        Args:
+            price (float): The price to convert
+            currency (str): Currency code (USD, EUR, GBP, ZAR)
+
+        Returns:
+            float: Price in ZAR, or None for a missing/zero price
+        """
+        if price is None or price == 0:
+            return None
+
+        return round(price * self.get_rate(currency), 2)
+
+    def convert_many(self, prices, currencies):
+        """
+        Convert a batch of prices to ZAR in a single vectorized operation.
+
+        Args:
+            prices (array-like): Prices to convert (None/NaN allowed)
+            currencies (array-like): Currency code for each price
+
+        Returns:
+            numpy.ndarray: Prices in ZAR rounded to cents, NaN where the
+            input price was missing or zero
+        """
+        import numpy as np
+
+        prices = np.asarray(prices, dtype=float)
+        codes = np.char.upper(np.asarray(currencies, dtype=str))
+        if prices.shape != codes.shape:
+            raise ValueError("prices and currencies must have the same length")
+
+        rates = self.get_rates()
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        unique_rates = np.array([rates.get(code, 1.0) for code in unique_codes], dtype=float)
+
+        converted = np.round(prices * unique_rates[inverse.reshape(prices.shape)], 2)
+        converted[prices == 0] = np.nan
+        return converted
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_rate_provider():
+    """
+    Get the process-wide ExchangeRateProvider shared by pipelines and spiders.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = ExchangeRateProvider()
+    return _provider
+
+
 def convert_to_zar(price, currency='ZAR'):
     """
     Convert a price from any currency to ZAR.
-    
+
     Args:
         price (float): The price to convert
         currency (str): Currency code (USD, EUR, GBP, ZAR)
-        
+
     Returns:
         float: Price in ZAR
     """
-    if price is None or price == 0:
-        return None
-        
-    # Get current exchange rates
-    rates = get_exchange_rates()
-    
-    # Apply exchange rate
-    rate = rates.get(currency.upper(), 1.0)
-    converted_price = price * rate
-    
-    return round(converted_price, 2)
\ No newline at end of file
+    return get_rate_provider().convert(price, currency)
+
+
+def convert_many(prices, currencies):
+    """
+    Convert a batch of prices to ZAR using the shared rate provider.
+
+    Args:
+        prices (array-like): Prices to convert
+        currencies (array-like): Currency code for each price
+
+    Returns:
+        numpy.ndarray: Prices in ZAR
+    """
+    return get_rate_provider().convert_many(prices, currencies)
@@ -0,0 +1,200 @@
+"""
+Failure diagnostics for spiders: counters, sampling and background dumps.
+"""
+import os
+import gzip
+import json
+import queue
+import logging
+import threading
+from datetime import datetime
+
+# Diagnostic levels, from cheapest to most verbose
+LEVELS = {
+    'off': 0,
+    'counters': 1,  # Count failures in the crawl stats only
+    'sample': 2,  # Also dump 1 in DIAGNOSTICS_SAMPLE_RATE failing pages
+    'full': 3,  # Dump every failing page
+}
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'on')
+_FALSE_VALUES = ('0', 'false', 'no', 'off', '')
+
+
+def parse_bool(value, default=False):
+    """
+    Parse a spider argument or setting as a boolean.
+
+    ``-a debug=False`` arrives as the string 'False', which is truthy, so
+    strings are matched against the usual spellings instead.
+    """
+    if value is None:
+        return default
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean value: {value!r}")
+    return bool(value)
+
+
+def parse_level(value, default='counters'):
+    """
+    Parse a diagnostics level given as a name, a number or a boolean.
+
+    Returns:
+        int: One of the LEVELS values
+    """
+    if value is None:
+        value = default
+    if isinstance(value, bool):
+        return LEVELS['full'] if value else LEVELS['counters']
+    if isinstance(value, int):
+        return min(max(value, 0), LEVELS['full'])
+    lowered = str(value).strip().lower()
+    if lowered in LEVELS:
+        return LEVELS[lowered]
+    if lowered.isdigit():
+        return parse_level(int(lowered))
+    return parse_level(parse_bool(lowered))
+
+
+class DumpWriter:
+    """
+    Background thread writing gzip-compressed dumps from a bounded queue.
+
+    Dumps submitted while the queue is full are dropped rather than
+    blocking the crawl.
+    """
+
+    def __init__(self, directory, queue_size=100):
+        self.directory = directory
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.logger = logging.getLogger(__name__)
+        self._thread = threading.Thread(target=self._run, name='diagnostics-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, filename, body, record):
+        """
+        Queue a dump without blocking.
+
+        Returns:
+            bool: False if the dump was dropped
+        """
+        try:
+            self.queue.put_nowait((filename, body, record))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        index_file = os.path.join(self.directory, 'index.jsonl')
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                break
+            filename, body, record = entry
+            try:
+                with gzip.open(os.path.join(self.directory, filename), 'wb') as f:
+                    f.write(body)
+                with open(index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(dict(record, file=filename)) + '\n')
+            except OSError as e:
+                self.logger.warning(f"Could not write diagnostic dump {filename}: {e}")
+
+    def close(self):
+        """Write the remaining dumps and stop the thread"""
+        self.queue.put(None)
+        self._thread.join()
+
+
+class Diagnostics:
+    """
+    Record spider failures at the configured level.
+
+    At the default ``counters`` level a failure only increments a stats
+    counter. Dumps are handed to a DumpWriter started on first use, so
+    runs that never dump start no thread and touch no files.
+    """
+
+    def __init__(self, spider_name, level=LEVELS['counters'], sample_rate=10,
+                 directory='diagnostics', queue_size=100, stats=None):
+        self.spider_name = spider_name
+        self.level = level
+        self.sample_rate = max(int(sample_rate), 1)
+        self.run_dir = os.path.join(directory, f"{spider_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.queue_size = queue_size
+        self.stats = stats
+        self.counts = {}
+        self.writer = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_settings(cls, spider_name, settings, stats=None, level=None):
+        """
+        Args:
+            spider_name (str): Spider the failures belong to
+            settings (Settings): Crawler settings with DIAGNOSTICS_* values
+            stats (StatsCollector): Crawl stats for the counters
+            level: Level overriding DIAGNOSTICS_LEVEL, e.g. from a spider argument
+        """
+        return cls(
+            spider_name,
+            level=parse_level(level if level is not None else settings.get('DIAGNOSTICS_LEVEL')),
+            sample_rate=settings.getint('DIAGNOSTICS_SAMPLE_RATE', 10),
+            directory=settings.get('DIAGNOSTICS_DIR', 'diagnostics'),
+            queue_size=settings.getint('DIAGNOSTICS_QUEUE_SIZE', 100),
+            stats=stats,
+        )
+
+    @property
+    def enabled(self):
+        return self.level > LEVELS['off']
+
+    def record(self, kind, response=None, url=None, status=None):
+        """
+        Record a failure, dumping the response body if the level and sampling allow.
+
+        Args:
+            kind (str): Failure kind, e.g. 'http_error' or 'extraction'
+            response (Response): Response involved in the failure, if any
+            url (str): URL of the failure when there's no response
+            status (int): HTTP status when there's no response
+        """
+        if self.level == LEVELS['off']:
+            return
+
+        count = self.counts.get(kind, 0) + 1
+        self.counts[kind] = count
+        if self.stats is not None:
+            self.stats.inc_value(f'diagnostics/{kind}')
+
+        if response is None or self.level < LEVELS['sample']:
+            return
+        # Dump the first failure of each kind, then every Nth one
+        if self.level == LEVELS['sample'] and (count - 1) % self.sample_rate:
+            return
+
+        if self.writer is None:
+            self.writer = DumpWriter(self.run_dir, self.queue_size)
+            self.logger.info(f"Writing diagnostic dumps to {self.run_dir}")
+
+        status = response.status if status is None else status
+        record = {'kind': kind, 'url': url or response.url, 'status': status,
+                  'time': datetime.now().isoformat()}
+        if self.writer.submit(f"{kind}_{count:06d}_{status}.html.gz", response.body, record):
+            if self.stats is not None:
+                self.stats.inc_value('diagnostics/dumps')
+        elif self.stats is not None:
+            self.stats.inc_value('diagnostics/dropped')
+
+    def close(self):
+        """Flush pending dumps"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
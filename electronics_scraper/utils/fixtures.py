@@ -0,0 +1,80 @@
+"""
+Compressed store of recorded HTTP responses for offline replay.
+"""
+import os
+import gzip
+import json
+import base64
+
+
+def _json_safe(value):
+    """Return True if a meta value survives a JSON round trip"""
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class FixtureStore:
+    """
+    Directory of gzip-compressed JSON lines files, one per spider.
+
+    Each line holds one response with the request URL, callback name and
+    the JSON-serializable part of the request meta, so it can be fed back
+    through the same callback without touching the network.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, spider_name):
+        return os.path.join(self.path, f"{spider_name}.jsonl.gz")
+
+    def spiders(self):
+        """Names of spiders with recorded responses"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name[:-len('.jsonl.gz')] for name in os.listdir(self.path)
+                      if name.endswith('.jsonl.gz'))
+
+    def record(self, spider_name, request, response):
+        """
+        Append a response to the spider's fixture file.
+
+        Args:
+            spider_name (str): Spider that made the request
+            request (Request): The request
+            response (Response): The downloaded response
+        """
+        os.makedirs(self.path, exist_ok=True)
+        callback = getattr(request.callback, '__name__', None)
+        entry = {
+            'url': response.url,
+            'request_url': request.url,
+            'status': response.status,
+            'headers': {
+                key.decode('latin-1'): [value.decode('latin-1') for value in values]
+                for key, values in response.headers.items()
+            },
+            'body': base64.b64encode(response.body).decode('ascii'),
+            'callback': callback or 'parse',
+            'meta': {key: value for key, value in request.meta.items()
+                     if not key.startswith('_') and key != 'playwright_page' and _json_safe(value)},
+        }
+        # Appending creates a new gzip member, which readers handle transparently
+        with gzip.open(self._file(spider_name), 'at', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def load(self, spider_name):
+        """
+        Iterate over a spider's recorded responses.
+
+        Yields:
+            dict: Entries with the body decoded back to bytes
+        """
+        with gzip.open(self._file(spider_name), 'rt', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                entry['body'] = base64.b64decode(entry['body'])
+                yield entry
@@ -1,74 +1,563 @@
 """
 Utilities for matching similar products across different websites.
 """
+import os
+import re
+import json
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.utils import murmurhash3_32
+from sklearn.preprocessing import normalize
+
+from electronics_scraper.utils.normalizer import SPEC_PATTERNS
+
+
+# Maximum number of neighbours kept per product when building groups
+DEFAULT_TOP_K = 20
 
+# Upper bound on the similarity entries computed per chunk of rows
+MAX_CHUNK_ENTRIES = 10_000_000
+
+
+class UnionFind:
+    """
+    Disjoint-set forest over the integers 0..size-1.
+    """
 
-def group_similar_products(df, similarity_threshold=0.7):
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, x):
+        """Return the representative of x's set."""
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Path halving
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        """Merge the sets containing x and y."""
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return
+        if self.rank[root_x] < self.rank[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        if self.rank[root_x] == self.rank[root_y]:
+            self.rank[root_x] += 1
+
+
+def _tfidf_matrix(names, weights=None):
+    """
+    TF-IDF vectorize names the same way TfidfVectorizer(ngram_range=(1, 2)) does.
+
+    ``weights`` gives how many times each name occurs in the full corpus, so
+    duplicates can be vectorized once while keeping the document frequencies
+    of the full corpus.
+    """
+    counts = CountVectorizer(ngram_range=(1, 2), min_df=1).fit_transform(names)
+    if weights is None:
+        weights = np.ones(counts.shape[0])
+
+    n_documents = weights.sum()
+    document_frequency = (counts > 0).T.astype(np.float64) @ weights
+    idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    return normalize(counts.multiply(idf).tocsr())
+
+
+def _similar_pairs(matrix, similarity_threshold, top_k=DEFAULT_TOP_K,
+                   max_chunk_entries=MAX_CHUNK_ENTRIES):
+    """
+    Yield (rows, cols) arrays of pairs whose cosine similarity exceeds the threshold.
+
+    Similarities are computed as sparse dot products over chunks of rows, so
+    at most ``max_chunk_entries`` scores exist at a time and only pairs above
+    the threshold (at most ``top_k`` per row) are kept.
+    """
+    n_rows = matrix.shape[0]
+    matrix_t = matrix.T.tocsr()
+    chunk_size = max(1, min(n_rows, max_chunk_entries // max(n_rows, 1)))
+
+    for start in range(0, n_rows, chunk_size):
+        scores = (matrix[start:start + chunk_size] @ matrix_t).tocoo()
+        keep = (scores.data > similarity_threshold) & (scores.row + start != scores.col)
+        rows, cols = _top_k_pairs(scores.row[keep] + start, scores.col[keep], scores.data[keep], top_k)
+        if len(rows):
+            yield rows, cols
+
+
+def _top_k_pairs(rows, cols, values, top_k):
+    """Keep the ``top_k`` most similar (row, col) pairs of each row"""
+    if top_k is None or not len(rows):
+        return rows, cols
+    # Rank neighbours within each row by descending similarity
+    order = np.lexsort((-values, rows))
+    rows, cols = rows[order], cols[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+    return rows[rank < top_k], cols[rank < top_k]
+
+
+def _vectorize_names(names):
+    """
+    Vectorize the distinct names in ``names``.
+
+    Returns:
+        tuple: (codes mapping each position to its distinct name, list of
+        distinct names, TF-IDF matrix with one row per distinct name)
+    """
+    codes, unique_names = pd.factorize(pd.Series(names, dtype=object).fillna(''))
+    if len(unique_names) == 0:
+        raise ValueError("no names to vectorize")
+    unique_names = list(unique_names)
+    return codes, unique_names, _tfidf_matrix(unique_names, np.bincount(codes).astype(np.float64))
+
+
+def _groups_from_pairs(codes, tfidf_matrix, pairs):
+    """
+    Build position groups from similar (row, col) pairs of distinct names.
+    """
+    n_unique = tfidf_matrix.shape[0]
+    union_find = UnionFind(n_unique)
+    for rows, cols in pairs:
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            union_find.union(row, col)
+
+    roots = np.array([union_find.find(i) for i in range(n_unique)])
+    labels = roots[codes]
+
+    # Names without any features are never similar to anything, even themselves
+    empty = np.asarray(tfidf_matrix.getnnz(axis=1) == 0)[codes]
+    labels[empty] = n_unique + np.flatnonzero(empty)
+
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    groups = [group.tolist() for group in np.split(order, boundaries) if len(group) > 1]
+    groups.sort(key=lambda group: group[0])
+    return groups
+
+
+def find_similar_groups(names, similarity_threshold=0.7, top_k=DEFAULT_TOP_K):
+    """
+    Group positions of similar names.
+
+    Identical names are vectorized once, candidate pairs come from chunked
+    sparse dot products and groups are the connected components of those
+    pairs, built with union-find.
+
+    Args:
+        names (list): Normalized product names
+        similarity_threshold (float): Threshold for considering products similar (0.0-1.0)
+        top_k (int): Maximum number of neighbours linked per name (None for all)
+
+    Returns:
+        list: Groups of positions into ``names``, each with more than one member
+    """
+    try:
+        codes, _, tfidf_matrix = _vectorize_names(names)
+    except ValueError:
+        # Handle case where all names are empty or contain only stop words
+        return []
+
+    pairs = _similar_pairs(tfidf_matrix, similarity_threshold, top_k)
+    return _groups_from_pairs(codes, tfidf_matrix, pairs)
+
+
+# Model families recognised in normalized names, with the brand they imply
+MODEL_FAMILY_PATTERNS = [
+    ('apple', re.compile(r'\b(iphone (?:\d+|se|xr|xs|x))\b')),
+    ('apple', re.compile(r'\b(ipad(?: pro| air| mini)?)\b')),
+    ('apple', re.compile(r'\b(macbook(?: pro| air)?)\b')),
+    ('apple', re.compile(r'\b(apple watch (?:series \d+|se|ultra))\b')),
+    ('apple', re.compile(r'\b(airpods(?: pro| max)?)\b')),
+    ('samsung', re.compile(r'\b(galaxy (?:s\d+|a\d+|note \d+|z \w+|tab \w+))\b')),
+    ('google', re.compile(r'\b(pixel \d+a?)\b')),
+    ('sony', re.compile(r'\b(playstation \d|ps\d)\b')),
+    ('microsoft', re.compile(r'\b(xbox(?: series [xs]| one)?)\b')),
+    ('nintendo', re.compile(r'\b(switch(?: oled| lite)?)\b')),
+]
+
+BRAND_RE = re.compile(
+    r'\b(apple|samsung|google|sony|microsoft|nintendo|huawei|xiaomi|oppo|nokia|'
+    r'motorola|lenovo|hp|dell|asus|acer|lg)\b'
+)
+
+# Inputs with fewer rows than this are matched in-process even when a pool is allowed
+MIN_PARALLEL_ROWS = 5000
+
+
+def _storage_gb(normalized_name):
+    """Largest storage capacity mentioned in a name, in GB (RAM is always smaller)."""
+    capacities = []
+    for match in SPEC_PATTERNS['storage'].finditer(normalized_name):
+        size, unit = int(match.group(1)), match.group(2).upper()
+        capacities.append(size * {'TB': 1024, 'GB': 1, 'MB': 1 / 1024}[unit])
+    return max(capacities) if capacities else None
+
+
+def blocking_key(normalized_name):
+    """
+    Derive the (brand, model family, storage) blocking key for a product.
+
+    Args:
+        normalized_name (str): Name produced by normalize_product_name
+
+    Returns:
+        tuple: (brand, model family, storage in GB); unknown parts are None
+    """
+    if not isinstance(normalized_name, str):
+        return (None, None, None)
+
+    brand, family = None, None
+    for family_brand, pattern in MODEL_FAMILY_PATTERNS:
+        match = pattern.search(normalized_name)
+        if match:
+            brand, family = family_brand, match.group(1)
+            break
+
+    if brand is None:
+        match = BRAND_RE.search(normalized_name)
+        brand = match.group(1) if match else None
+
+    return (brand, family, _storage_gb(normalized_name))
+
+
+def _match_block(args):
+    """Find similar pairs within one block (executed in pool workers)."""
+    block_matrix, rows, similarity_threshold, top_k = args
+    return [(rows[r], rows[c]) for r, c in _similar_pairs(block_matrix, similarity_threshold, top_k)]
+
+
+def find_blocked_groups(names, similarity_threshold=0.7, top_k=DEFAULT_TOP_K, max_workers=None):
+    """
+    Group positions of similar names, only comparing names within the same block.
+
+    Names are vectorized once over the whole corpus, so scores are the same
+    as find_similar_groups; pairs are then only scored within each
+    blocking_key block, in parallel across a process pool for large inputs.
+
+    Args:
+        names (list): Normalized product names
+        similarity_threshold (float): Threshold for considering products similar (0.0-1.0)
+        top_k (int): Maximum number of neighbours linked per name
+        max_workers (int): Pool size (defaults to the CPU count, 1 disables the pool)
+
+    Returns:
+        list: Groups of positions into ``names``, each with more than one member
+    """
+    try:
+        codes, distinct_names, tfidf_matrix = _vectorize_names(names)
+    except ValueError:
+        return []
+
+    # Distinct names are grouped by key; positions sharing a name follow via codes
+    blocks = {}
+    for row, name in enumerate(distinct_names):
+        blocks.setdefault(blocking_key(name), []).append(row)
+
+    tasks = [
+        (tfidf_matrix[rows], np.asarray(rows), similarity_threshold, top_k)
+        for rows in blocks.values() if len(rows) > 1
+    ]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers > 1 and len(tasks) > 1 and len(names) >= MIN_PARALLEL_ROWS:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunksize = max(1, len(tasks) // (max_workers * 4))
+            results = list(executor.map(_match_block, tasks, chunksize=chunksize))
+    else:
+        results = [_match_block(task) for task in tasks]
+
+    pairs = (pair for block_pairs in results for pair in block_pairs)
+    return _groups_from_pairs(codes, tfidf_matrix, pairs)
+
+
+class SimilarityBackend:
+    """
+    Strategy for finding groups of similar names.
+
+    Backends differ in how candidate pairs are generated. A pair is only
+    linked when the TF-IDF cosine similarity of its names exceeds the
+    threshold, so all backends share the same threshold semantics.
+    """
+
+    name = None
+
+    def find_groups(self, names, similarity_threshold=0.7, top_k=DEFAULT_TOP_K):
+        """
+        Group positions of similar names.
+
+        Args:
+            names (list): Normalized product names
+            similarity_threshold (float): Threshold for considering products similar (0.0-1.0)
+            top_k (int): Maximum number of neighbours linked per name (None for all)
+
+        Returns:
+            list: Groups of positions into ``names``, each with more than one member
+        """
+        raise NotImplementedError
+
+
+class TfidfBackend(SimilarityBackend):
+    """Score every pair of distinct names with chunked sparse products (find_similar_groups)"""
+
+    name = 'tfidf'
+
+    def find_groups(self, names, similarity_threshold=0.7, top_k=DEFAULT_TOP_K):
+        return find_similar_groups(names, similarity_threshold, top_k)
+
+
+def _ranges(starts, lengths):
+    """Concatenation of arange(start, start + length) for each start and length"""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(np.asarray(starts, dtype=np.int64), lengths) + offsets
+
+
+# 64-bit FNV-1a parameters, used to hash shingles and band keys
+_FNV_PRIME = np.uint64(1099511628211)
+_FNV_OFFSET = np.uint64(14695981039346656037)
+
+
+class MinHashLSHBackend(SimilarityBackend):
+    """
+    Only score pairs of names that share a MinHash-LSH bucket.
+
+    Each distinct name gets a MinHash signature over its character
+    shingles. Signatures are split into ``bands`` bands, and names whose
+    band values all agree share a bucket. Pairs sharing at least one
+    bucket are verified with their TF-IDF cosine similarity.
+
+    Names with Jaccard similarity s become candidates with probability
+    1 - (1 - s**rows)**bands, where rows = num_perm // bands. Shingling,
+    hashing and banding are vectorized with NumPy.
+
+    Args:
+        num_perm (int): MinHash signature length
+        bands (int): Number of LSH bands; must divide num_perm
+        shingle_size (int): Characters per shingle
+        max_bucket (int): Buckets with more names are verified with one
+            sparse product instead of by enumerating their pairs
+        seed (int): Seed of the hash functions
+    """
+
+    name = 'minhash'
+
+    def __init__(self, num_perm=128, bands=32, shingle_size=3, max_bucket=100, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_bucket = max_bucket
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions: (a * x + b) >> 32 with odd a
+        self._a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def _shingle_hashes(self, names):
+        """
+        64-bit hashes of the character shingles of each name.
+
+        Names shorter than a shingle are a single shingle; empty names have none.
+
+        Returns:
+            tuple: (hashes, number of shingles per name)
+        """
+        encoded = [name.encode('utf-8') for name in names]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        k = self.shingle_size
+        counts = np.where(lengths >= k, lengths - k + 1, (lengths > 0).astype(np.int64))
+
+        # Start of every shingle in the concatenated names
+        starts = _ranges(np.cumsum(lengths) - lengths, counts)
+        widths = np.repeat(np.minimum(lengths, k), counts)
+
+        data = np.frombuffer(b''.join(encoded) + bytes(k), dtype=np.uint8).astype(np.uint64)
+        hashes = np.full(len(starts), _FNV_OFFSET, dtype=np.uint64)
+        for offset in range(k):
+            byte = np.where(offset < widths, data[starts + offset], np.uint64(0))
+            hashes = (hashes ^ byte) * _FNV_PRIME
+        return hashes, counts
+
+    def signatures(self, names):
+        """
+        MinHash signatures of the names.
+
+        Returns:
+            tuple: (uint32 array of shape (num_perm, len(names)), one row per
+            hash function, and a boolean mask of names with at least one shingle)
+        """
+        hashes, counts = self._shingle_hashes(names)
+        has_shingles = counts > 0
+        signatures = np.full((self.num_perm, len(names)), np.iinfo(np.uint32).max, dtype=np.uint32)
+        rows = np.flatnonzero(has_shingles)
+        if not len(rows):
+            return signatures, has_shingles
+
+        # One 1-D reduction per hash function is several times faster than a
+        # 2-D reduceat over all of them, and keeps memory linear in the shingles
+        segments = (np.cumsum(counts) - counts)[rows]
+        shift = np.uint64(32)
+        for i, (a, b) in enumerate(zip(self._a, self._b)):
+            values = ((hashes * a + b) >> shift).astype(np.uint32)
+            signatures[i, rows] = np.minimum.reduceat(values, segments)
+        return signatures, has_shingles
+
+    def _band_buckets(self, signatures, rows):
+        """
+        Bucket ``rows`` band by band.
+
+        Yields:
+            tuple: (rows ordered by bucket, start and size of each bucket with
+            more than one row)
+        """
+        rows_per_band = self.num_perm // self.bands
+        for band in range(self.bands):
+            keys = np.full(len(rows), _FNV_OFFSET, dtype=np.uint64)
+            for i in range(band * rows_per_band, (band + 1) * rows_per_band):
+                keys = (keys ^ signatures[i, rows].astype(np.uint64)) * _FNV_PRIME
+            order = np.argsort(keys, kind='stable')
+            boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+            starts = np.concatenate(([0], boundaries))
+            sizes = np.diff(np.concatenate((starts, [len(order)])))
+            yield rows[order], starts[sizes > 1], sizes[sizes > 1]
+
+    def candidate_pairs(self, signatures, has_shingles, tfidf_matrix, similarity_threshold):
+        """
+        Distinct (row, col) pairs with row < col sharing at least one bucket.
+
+        Pairs in buckets larger than ``max_bucket`` are pre-filtered with a
+        sparse product of the bucket's TF-IDF rows.
+        """
+        rows = np.flatnonzero(has_shingles)
+        n_rows = np.int64(signatures.shape[1])
+        keys = []
+        large_buckets = set()
+        for members, starts, sizes in self._band_buckets(signatures, rows):
+            small = sizes <= self.max_bucket
+            # Enumerate the pairs i < j of every small bucket
+            left = _ranges(starts[small], sizes[small] - 1)
+            partners = np.repeat(starts[small] + sizes[small], sizes[small] - 1) - left - 1
+            right = _ranges(left + 1, partners)
+            first, second = members[np.repeat(left, partners)], members[right]
+            keys.append(np.minimum(first, second) * n_rows + np.maximum(first, second))
+            for start, size in zip(starts[~small], sizes[~small]):
+                large_buckets.add(tuple(np.sort(members[start:start + size]).tolist()))
+
+        for bucket in large_buckets:
+            bucket = np.asarray(bucket)
+            for block_rows, block_cols in _similar_pairs(tfidf_matrix[bucket], similarity_threshold, None):
+                first, second = bucket[block_rows], bucket[block_cols]
+                keys.append(np.minimum(first, second) * n_rows + np.maximum(first, second))
+
+        keys = np.sort(np.concatenate(keys)) if keys else np.array([], dtype=np.int64)
+        # Sort-based dedup; np.unique's hash table is several times slower on millions of pairs
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        return keys // n_rows, keys % n_rows
+
+    def verified_pairs(self, rows, cols, tfidf_matrix, similarity_threshold, top_k):
+        """Yield the candidate pairs whose TF-IDF cosine similarity exceeds the threshold"""
+        terms_per_row = max(tfidf_matrix.getnnz() // max(tfidf_matrix.shape[0], 1), 1)
+        chunk_size = max(MAX_CHUNK_ENTRIES // terms_per_row, 1)
+        kept_rows, kept_cols, kept_values = [], [], []
+        for start in range(0, len(rows), chunk_size):
+            first, second = rows[start:start + chunk_size], cols[start:start + chunk_size]
+            values = np.asarray(tfidf_matrix[first].multiply(tfidf_matrix[second]).sum(axis=1)).ravel()
+            keep = values > similarity_threshold
+            kept_rows.append(first[keep])
+            kept_cols.append(second[keep])
+            kept_values.append(values[keep])
+        if not kept_rows:
+            return
+        first, second, values = (np.concatenate(arrays) for arrays in (kept_rows, kept_cols, kept_values))
+        # Both directions, so top_k applies per name as in _similar_pairs
+        rows, cols = _top_k_pairs(np.concatenate((first, second)), np.concatenate((second, first)),
+                                  np.concatenate((values, values)), top_k)
+        if len(rows):
+            yield rows, cols
+
+    def find_groups(self, names, similarity_threshold=0.7, top_k=DEFAULT_TOP_K):
+        try:
+            codes, distinct_names, tfidf_matrix = _vectorize_names(names)
+        except ValueError:
+            return []
+
+        signatures, has_shingles = self.signatures(distinct_names)
+        rows, cols = self.candidate_pairs(signatures, has_shingles, tfidf_matrix, similarity_threshold)
+        pairs = self.verified_pairs(rows, cols, tfidf_matrix, similarity_threshold, top_k)
+        return _groups_from_pairs(codes, tfidf_matrix, pairs)
+
+
+SIMILARITY_BACKENDS = {
+    TfidfBackend.name: TfidfBackend,
+    MinHashLSHBackend.name: MinHashLSHBackend,
+}
+
+
+def get_similarity_backend(backend=None, **options):
+    """
+    Resolve a similarity backend.
+
+    Args:
+        backend: Backend name from SIMILARITY_BACKENDS, a SimilarityBackend
+            instance, or None for TF-IDF
+        **options: Constructor arguments of the named backend
+
+    Returns:
+        SimilarityBackend: The backend
+    """
+    if isinstance(backend, SimilarityBackend):
+        return backend
+    name = backend or TfidfBackend.name
+    if name not in SIMILARITY_BACKENDS:
+        raise ValueError(f"Unknown similarity backend {name!r}, expected one of {sorted(SIMILARITY_BACKENDS)}")
+    return SIMILARITY_BACKENDS[name](**options)
+
+
+def group_similar_products(df, similarity_threshold=0.7, top_k=DEFAULT_TOP_K,
+                           blocking=False, max_workers=None, backend=None):
     """
     Group similar products using text similarity on normalized names.
     
     Args:
         df (DataFrame): DataFrame containing product data
         similarity_threshold (float): Threshold for considering products similar (0.0-1.0)
+        top_k (int): Maximum number of neighbours linked per product
+        blocking (bool): Only compare products sharing a (brand, model family, storage) key
+        max_workers (int): Process pool size used for blocked matching
+        backend: Similarity backend name or instance for unblocked matching (see get_similarity_backend)
         
     Returns:
         list: List of groups, where each group is a list of similar products
     """
     if df.empty or 'normalized_name' not in df.columns:
         return []
-        
-    # Extract names for vectorization
-    names = df['normalized_name'].fillna('').tolist()
-    
-    # Use TF-IDF vectorization for better matching
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=1)
-    
-    try:
-        tfidf_matrix = vectorizer.fit_transform(names)
-    except ValueError:
-        # Handle case where all names are empty or contain only stop words
-        return []
-    
-    # Calculate similarity matrix
-    similarity_matrix = cosine_similarity(tfidf_matrix)
-    
-    # Group similar products (similarity > threshold)
-    groups = []
-    used_indices = set()
     
-    for i in range(len(names)):
-        if i in used_indices:
-            continue
-            
-        # Find similar products
-        group = [i]
-        used_indices.add(i)
-        
-        for j in range(len(names)):
-            if j != i and j not in used_indices and similarity_matrix[i, j] > similarity_threshold:
-                group.append(j)
-                used_indices.add(j)
-        
-        if len(group) > 1:  # Only keep groups with multiple products
-            groups.append([df.iloc[idx] for idx in group])
-    
-    return groups
+    names = df['normalized_name'].tolist()
+    if blocking:
+        groups = find_blocked_groups(names, similarity_threshold, top_k, max_workers)
+    else:
+        groups = get_similarity_backend(backend).find_groups(names, similarity_threshold, top_k)
+    return [[df.iloc[idx] for idx in group] for group in groups]
 
 
-def find_exact_matches(df, keys=None):
+def find_exact_match_indices(df, keys=None):
     """
-    Find exact matches based on specific keys.
+    Find exact matches based on specific keys, as positional indices.
     
     Args:
         df (DataFrame): DataFrame containing product data
         keys (list): List of columns to use for matching
         
     Returns:
-        list: List of groups of matching products
+        list: Arrays of row positions, one per group with more than one row
     """
     if df.empty:
         return []
@@ -81,43 +570,331 @@ def find_exact_matches(df, keys=None):
     if not valid_keys:
         return []
     
-    # Group by the specified keys
-    grouped = df.groupby(valid_keys)
-    
-    # Extract groups with more than one item
-    result = []
-    for _, group in grouped:
-        if len(group) > 1:
-            result.append(group.to_dict('records'))
+    # Group by the specified keys without materializing the groups
+    indices = df.groupby(valid_keys).indices
+    return [positions for positions in indices.values() if len(positions) > 1]
+
+
+def find_exact_matches(df, keys=None):
+    """
+    Find exact matches based on specific keys.
     
-    return result
+    Args:
+        df (DataFrame): DataFrame containing product data
+        keys (list): List of columns to use for matching
+        
+    Returns:
+        list: List of groups of matching products
+    """
+    return [df.iloc[positions].to_dict('records') for positions in find_exact_match_indices(df, keys)]
 
 
-def enhance_product_matching(df):
+def enhance_product_matching(df, similarity_threshold=0.7, blocking=False, backend=None):
     """
     Enhanced product matching combining multiple techniques.
     
     Args:
         df (DataFrame): DataFrame containing product data
+        similarity_threshold (float): Threshold for the similarity stage (0.0-1.0)
+        blocking (bool): Use blocked similarity matching
+        backend: Similarity backend name or instance for unblocked matching (see get_similarity_backend)
         
     Returns:
         list: List of groups of matching products
     """
     # First try exact matches on normalized names
-    exact_matches = find_exact_matches(df, ['normalized_name'])
+    exact_groups = find_exact_match_indices(df, ['normalized_name'])
     
-    # Then use similarity matching for remaining products
-    used_indices = set()
-    for group in exact_matches:
-        for item in group:
-            idx = df[df['name'] == item['name']].index
-            if not idx.empty:
-                used_indices.add(idx[0])
+    # Then use similarity matching for the remaining positions
+    used = np.zeros(len(df), dtype=bool)
+    for positions in exact_groups:
+        used[positions] = True
+    remaining = np.flatnonzero(~used)
     
-    remaining_df = df.drop(list(used_indices))
-    similarity_matches = group_similar_products(remaining_df)
+    similarity_groups = []
+    if len(remaining) and 'normalized_name' in df.columns:
+        names = df['normalized_name'].iloc[remaining].tolist()
+        if blocking:
+            groups = find_blocked_groups(names, similarity_threshold)
+        else:
+            groups = get_similarity_backend(backend).find_groups(names, similarity_threshold)
+        similarity_groups = [remaining[group] for group in groups]
     
-    # Combine results
-    all_matches = exact_matches + similarity_matches
+    # Materialize rows only for the output
+    exact_matches = [df.iloc[positions].to_dict('records') for positions in exact_groups]
+    similarity_matches = [[df.iloc[idx] for idx in positions] for positions in similarity_groups]
     
-    return all_matches
\ No newline at end of file
+    return exact_matches + similarity_matches
+
+
+# Hashed feature space of the canonical catalog; fixed so vectors stay comparable across runs
+CATALOG_N_FEATURES = 2 ** 20
+
+# New canonicals are buffered and merged into the inverted index in batches of this size
+CATALOG_MERGE_EVERY = 256
+
+
+class CanonicalCatalog:
+    """
+    Persistent catalog of canonical products for matching items on ingest.
+
+    Names are hashed into a fixed feature space (word unigrams and bigrams,
+    like the batch matcher) and weighted with an IDF fitted on every
+    distinct name seen. Canonical vectors are kept as a sparse matrix
+    and an inverted index (its transpose as CSR), so scoring an item only
+    touches the canonicals sharing one of its terms.
+
+    An item gets the id of the most similar canonical when the cosine
+    similarity clears the threshold, and a new canonical otherwise.
+    Identical normalized names are resolved through a dict without scoring.
+
+    The IDF is only refitted by ``compact()``, the periodic offline job that
+    also re-vectorizes the canonicals and merges those that have become
+    similar. Merged ids stay valid as aliases of the canonical they were
+    merged into. Until the first compaction every term weighs the same.
+
+    Args:
+        path (str): Directory holding the catalog, loaded if it exists
+        similarity_threshold (float): Minimum cosine similarity to join a canonical
+    """
+
+    def __init__(self, path=None, similarity_threshold=0.7):
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.vectorizer = HashingVectorizer(ngram_range=(1, 2), n_features=CATALOG_N_FEATURES,
+                                            alternate_sign=False, norm=None)
+        self._analyzer = self.vectorizer.build_analyzer()
+        self.idf = None  # Fitted by compact()
+        self.doc_freq = np.zeros(CATALOG_N_FEATURES, dtype=np.float64)
+        self.n_documents = 0
+        self.names = []  # Representative name per canonical id
+        self.aliases = {}  # Merged canonical id -> id it was merged into
+        self.exact = {}  # Normalized name -> canonical id
+        self.vectors = _empty_csr(0)  # One row per canonical id
+        self._index = self.vectors.T.tocsr()
+        self._pending = []  # Vectors of canonicals not yet in the index
+        self._pending_postings = {}  # Feature -> [(pending position, weight)]
+        self.dirty = False
+        if path and os.path.exists(os.path.join(path, 'catalog.npz')):
+            self.load()
+
+    def __len__(self):
+        return len(self.names) - len(self.aliases)
+
+    def _vectorize(self, names):
+        vectors = self.vectorizer.transform(names).tocsr()
+        if self.idf is not None:
+            # Scale stored entries only; multiplying by the dense IDF would densify
+            vectors.data *= self.idf[vectors.indices]
+        return normalize(vectors)
+
+    def resolve(self, canonical_id):
+        """Follow aliases to the canonical an id was merged into"""
+        while canonical_id in self.aliases:
+            canonical_id = self.aliases[canonical_id]
+        return canonical_id
+
+    def _features(self, normalized_name):
+        """
+        Hashed features of one name and their L2-normalized weights.
+
+        Same hashing as the vectorizer's transform, without its per-call
+        overhead, since items are matched one at a time.
+        """
+        hashes = [abs(murmurhash3_32(term, seed=0)) % CATALOG_N_FEATURES
+                  for term in self._analyzer(normalized_name)]
+        indices, counts = np.unique(np.array(hashes, dtype=np.int64), return_counts=True)
+        weights = counts.astype(np.float64)
+        if self.idf is not None:
+            weights *= self.idf[indices]
+        norm = np.sqrt(weights @ weights)
+        return indices, weights / norm if norm else weights
+
+    @staticmethod
+    def _score(index, indices, weights):
+        """Best (column, cosine similarity) of a feature-by-canonical index, or (None, 0.0)"""
+        starts, ends = index.indptr[indices], index.indptr[indices + 1]
+        hits = ends > starts
+        if not hits.any():
+            return None, 0.0
+        columns = np.concatenate([index.indices[s:e] for s, e in zip(starts[hits], ends[hits])])
+        values = np.concatenate([index.data[s:e] * w for s, e, w in zip(starts[hits], ends[hits], weights[hits])])
+        scores = np.bincount(columns, weights=values)
+        best = int(scores.argmax())
+        return best, float(scores[best])
+
+    def _best_match(self, indices, weights):
+        """Most similar canonical and its score, or (None, 0.0)"""
+        best_id, best_score = self._score(self._index, indices, weights)
+
+        # Canonicals added since the last merge are few; score them through their postings
+        pending_scores = {}
+        for feature, weight in zip(indices.tolist(), weights.tolist()):
+            for position, value in self._pending_postings.get(feature, ()):
+                pending_scores[position] = pending_scores.get(position, 0.0) + weight * value
+        if pending_scores:
+            position = max(pending_scores, key=pending_scores.get)
+            if pending_scores[position] > best_score:
+                best_id, best_score = self._index.shape[1] + position, pending_scores[position]
+        return best_id, best_score
+
+    def match(self, normalized_name):
+        """
+        Return the canonical id for a product, creating a canonical if nothing matches.
+
+        Args:
+            normalized_name (str): Name produced by normalize_product_name
+
+        Returns:
+            int: Canonical id, or None for an empty name
+        """
+        if not isinstance(normalized_name, str) or not normalized_name:
+            return None
+
+        canonical_id = self.exact.get(normalized_name)
+        if canonical_id is not None:
+            return self.resolve(canonical_id)
+
+        indices, weights = self._features(normalized_name)
+        if not len(indices):
+            return None
+        self.doc_freq[indices] += 1
+        self.n_documents += 1
+
+        best_id, best_score = self._best_match(indices, weights)
+        if best_id is not None and best_score >= self.similarity_threshold:
+            canonical_id = self.resolve(best_id)
+        else:
+            canonical_id = self._add(normalized_name, indices, weights)
+
+        self.exact[normalized_name] = canonical_id
+        self.dirty = True
+        return canonical_id
+
+    def _add(self, name, indices, weights):
+        """Create a canonical and return its id"""
+        canonical_id = len(self.names)
+        self.names.append(name)
+        position = len(self._pending)
+        self._pending.append(sp.csr_matrix((weights, indices, [0, len(indices)]), shape=(1, CATALOG_N_FEATURES)))
+        for feature, weight in zip(indices.tolist(), weights.tolist()):
+            self._pending_postings.setdefault(feature, []).append((position, weight))
+        if len(self._pending) >= CATALOG_MERGE_EVERY:
+            self._merge_pending()
+        return canonical_id
+
+    def _merge_pending(self):
+        if self._pending:
+            self.vectors = sp.vstack([self.vectors] + self._pending).tocsr()
+            self._index = self.vectors.T.tocsr()
+            self._pending = []
+            self._pending_postings = {}
+
+    def compact(self, top_k=DEFAULT_TOP_K):
+        """
+        Refit the IDF, re-vectorize every canonical and merge those now similar.
+
+        Returns:
+            int: Number of canonicals merged away
+        """
+        self._merge_pending()
+        if not self.names:
+            return 0
+
+        self.idf = np.log((1 + self.n_documents) / (1 + self.doc_freq)) + 1
+        live = np.array([i not in self.aliases for i in range(len(self.names))])
+        vectors = self._vectorize(self.names)
+        # Merged canonicals keep their row, empty, so ids stay positional
+        vectors = sp.diags(live.astype(np.float64)) @ vectors
+
+        union_find = UnionFind(len(self.names))
+        for rows, cols in _similar_pairs(vectors.tocsr(), self.similarity_threshold, top_k):
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                union_find.union(row, col)
+
+        # The oldest canonical of each group survives
+        survivors = {}
+        for canonical_id in np.flatnonzero(live).tolist():
+            survivors.setdefault(union_find.find(canonical_id), canonical_id)
+        merged = 0
+        for canonical_id in np.flatnonzero(live).tolist():
+            survivor = survivors[union_find.find(canonical_id)]
+            if survivor != canonical_id:
+                self.aliases[canonical_id] = survivor
+                live[canonical_id] = False
+                merged += 1
+
+        self.vectors = (sp.diags(live.astype(np.float64)) @ vectors).tocsr()
+        self.vectors.eliminate_zeros()
+        self._index = self.vectors.T.tocsr()
+        self.dirty = True
+        return merged
+
+    def save(self):
+        """Write the catalog to its directory, replacing the previous files"""
+        if not self.path:
+            return
+        self._merge_pending()
+        os.makedirs(self.path, exist_ok=True)
+
+        arrays_file = os.path.join(self.path, 'catalog.tmp.npz')
+        np.savez_compressed(
+            arrays_file,
+            idf=self.idf if self.idf is not None else np.empty(0),
+            doc_freq=self.doc_freq,
+            n_documents=np.array(self.n_documents),
+            similarity_threshold=np.array(self.similarity_threshold),
+            data=self.vectors.data,
+            indices=self.vectors.indices,
+            indptr=self.vectors.indptr,
+            alias_from=np.array(list(self.aliases), dtype=np.int64),
+            alias_to=np.array(list(self.aliases.values()), dtype=np.int64),
+        )
+        names_file = os.path.join(self.path, 'names.tmp.json')
+        with open(names_file, 'w', encoding='utf-8') as f:
+            json.dump({'names': self.names, 'exact': self.exact}, f, ensure_ascii=False)
+
+        os.replace(arrays_file, os.path.join(self.path, 'catalog.npz'))
+        os.replace(names_file, os.path.join(self.path, 'names.json'))
+        self.dirty = False
+
+    def load(self):
+        """Read the catalog from its directory"""
+        with open(os.path.join(self.path, 'names.json'), encoding='utf-8') as f:
+            state = json.load(f)
+        self.names = state['names']
+        self.exact = state['exact']
+
+        with np.load(os.path.join(self.path, 'catalog.npz')) as arrays:
+            self.idf = arrays['idf'] if arrays['idf'].size else None
+            self.doc_freq = arrays['doc_freq']
+            self.n_documents = int(arrays['n_documents'])
+            self.vectors = sp.csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=(len(self.names), CATALOG_N_FEATURES),
+            )
+            self.aliases = dict(zip(arrays['alias_from'].tolist(), arrays['alias_to'].tolist()))
+        self._index = self.vectors.T.tocsr()
+        self._pending = []
+        self._pending_postings = {}
+        self.dirty = False
+
+
+def _empty_csr(rows):
+    return sp.csr_matrix((rows, CATALOG_N_FEATURES), dtype=np.float64)
+
+
+_catalogs = {}
+
+
+def get_catalog(path, similarity_threshold=0.7):
+    """
+    Return the process-wide catalog stored at ``path``.
+
+    Spiders crawling in the same process share one instance, so canonical
+    ids are assigned consistently and the catalog is saved without races.
+    """
+    key = os.path.abspath(path)
+    if key not in _catalogs:
+        _catalogs[key] = CanonicalCatalog(path, similarity_threshold)
+    return _catalogs[key]
@@ -2,6 +2,141 @@
 Utilities for normalizing product names and descriptions.
 """
 import re
+from functools import lru_cache
+
+
+# Words that don't help with matching
+STOPWORDS = ['new', 'used', 'refurbished', 'like', 'condition', 'grade', 'certified']
+
+# Ordered (pattern, replacement) rules standardizing common product names
+NORMALIZATION_RULES = [
+    # iPhones
+    (r'iphone\s*(\d+)\s*(pro)?\s*(max)?', r'iphone \1 \2 \3'),
+    (r'iphone\s*(\d+)\s*(plus)', r'iphone \1 plus'),
+    (r'iphone\s*(\d+)\s*(mini)', r'iphone \1 mini'),
+
+    # Samsung Galaxy
+    (r'galaxy\s*s(\d+)', r'galaxy s\1'),
+    (r'galaxy\s*note\s*(\d+)', r'galaxy note \1'),
+    (r'galaxy\s*a(\d+)', r'galaxy a\1'),
+
+    # Apple Products
+    (r'airpods\s*(pro)?\s*(gen|generation)?\s*(\d+)?', r'airpods \1 \3'),
+    (r'macbook\s*(pro|air)?\s*(\d+)?"?', r'macbook \1 \2"'),
+    (r'apple\s*watch\s*(series)?\s*(\d+)', r'apple watch series \2'),
+    (r'ipad\s*(pro|air|mini)?\s*(\d+)?', r'ipad \1 \2'),
+
+    # Storage capacity
+    (r'(\d+)\s*gb', r'\1gb'),
+    (r'(\d+)\s*tb', r'\1tb'),
+
+    # Colors
+    (r'(black|white|gold|silver|gray|grey|blue|red|green|yellow|purple)', r'\1'),
+]
+
+# Common patterns for electronics specs
+SPEC_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE) for key, pattern in {
+        'storage': r'(\d+)\s*(GB|TB|MB)',
+        'ram': r'(\d+)\s*(GB|MB)\s*RAM',
+        'processor': r'(i\d|ryzen|snapdragon|a\d+|m\d+)[\s\-](\d+)',
+        'screen': r'(\d+\.?\d*)"',
+        'battery': r'(\d+)\s*mAh',
+        'camera': r'(\d+)\s*MP',
+        'condition': r'(new|used|refurbished|like new|excellent|good|fair)',
+        'model_year': r'(20\d\d)'
+    }.items()
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+
+
+class Normalizer:
+    """
+    Precompiled, memoized product name normalizer.
+
+    The stopwords are compiled into a single alternation and the rules into
+    an ordered table once, and results are kept in a bounded LRU cache keyed
+    on the raw title, since titles repeat heavily across listing pages.
+    """
+
+    def __init__(self, stopwords=None, rules=None, cache_size=65536):
+        stopwords = STOPWORDS if stopwords is None else stopwords
+        rules = NORMALIZATION_RULES if rules is None else rules
+
+        self.stopword_re = re.compile(r'\b(?:' + '|'.join(stopwords) + r')\b')
+        self.rules = [(re.compile(pattern), replacement) for pattern, replacement in rules]
+        self._cached_normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def normalize(self, name):
+        """
+        Normalize a single product name.
+
+        Args:
+            name (str): The product name to normalize
+
+        Returns:
+            str: Normalized product name
+        """
+        if not isinstance(name, str):
+            return ""
+        return self._cached_normalize(name)
+
+    __call__ = normalize
+
+    def _normalize(self, name):
+        name = self.stopword_re.sub('', name.lower())
+        name = _WHITESPACE_RE.sub(' ', name).strip()
+
+        for pattern, replacement in self.rules:
+            name = pattern.sub(replacement, name)
+
+        # Remove remaining special characters and clean up spaces
+        name = _SPECIAL_CHARS_RE.sub(' ', name)
+        return _WHITESPACE_RE.sub(' ', name).strip()
+
+    def normalize_series(self, names):
+        """
+        Normalize a pandas Series of product names.
+
+        Only the unique values are normalized (with vectorized ``.str`` ops)
+        and the results are mapped back onto the original positions.
+
+        Args:
+            names (Series): Product names
+
+        Returns:
+            Series: Normalized names with the same index
+        """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(names)
+        uniques = pd.Series(uniques, dtype=object)
+        is_str = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+
+        text = uniques.where(is_str, '').str.lower()
+        text = text.str.replace(self.stopword_re, '', regex=True)
+        text = text.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+
+        for pattern, replacement in self.rules:
+            text = text.str.replace(pattern, replacement, regex=True)
+
+        text = text.str.replace(_SPECIAL_CHARS_RE, ' ', regex=True)
+        text = text.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+
+        # Missing values get code -1, which picks the trailing empty string
+        normalized = np.append(text.to_numpy(dtype=object), '')
+        return pd.Series(normalized[codes], index=names.index, name=names.name, dtype=object)
+
+    def cache_info(self):
+        """Return the LRU cache statistics."""
+        return self._cached_normalize.cache_info()
+
+
+# Shared instance used by normalize_product_name
+default_normalizer = Normalizer()
 
 
 def normalize_product_name(name):
@@ -14,56 +149,7 @@ def normalize_product_name(name):
     Returns:
         str: Normalized product name
     """
-    if not isinstance(name, str):
-        return ""
-        
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Remove common words that don't help with matching
-    stopwords = ['new', 'used', 'refurbished', 'like', 'condition', 'grade', 'certified']
-    for word in stopwords:
-        name = re.sub(r'\b' + word + r'\b', '', name)
-    
-    # Standardize spaces
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    # Standardize common product names
-    patterns = {
-        # iPhones
-        r'iphone\s*(\d+)\s*(pro)?\s*(max)?': r'iphone \1 \2 \3',
-        r'iphone\s*(\d+)\s*(plus)': r'iphone \1 plus',
-        r'iphone\s*(\d+)\s*(mini)': r'iphone \1 mini',
-        
-        # Samsung Galaxy
-        r'galaxy\s*s(\d+)': r'galaxy s\1',
-        r'galaxy\s*note\s*(\d+)': r'galaxy note \1',
-        r'galaxy\s*a(\d+)': r'galaxy a\1',
-        
-        # Apple Products
-        r'airpods\s*(pro)?\s*(gen|generation)?\s*(\d+)?': r'airpods \1 \3',
-        r'macbook\s*(pro|air)?\s*(\d+)?"?': r'macbook \1 \2"',
-        r'apple\s*watch\s*(series)?\s*(\d+)': r'apple watch series \2',
-        r'ipad\s*(pro|air|mini)?\s*(\d+)?': r'ipad \1 \2',
-        
-        # Storage capacity
-        r'(\d+)\s*gb': r'\1gb',
-        r'(\d+)\s*tb': r'\1tb',
-        
-        # Colors
-        r'(black|white|gold|silver|gray|grey|blue|red|green|yellow|purple)': r'\1'
-    }
-    
-    for pattern, replacement in patterns.items():
-        name = re.sub(pattern, replacement, name)
-    
-    # Remove remaining special characters
-    name = re.sub(r'[^\w\s]', ' ', name)
-    
-    # Final cleanup of spaces
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    return name
+    return default_normalizer.normalize(name)
 
 
 def extract_specs(specs_text):
@@ -80,20 +166,8 @@ def extract_specs(specs_text):
     if not specs_text or not isinstance(specs_text, str):
         return specs
         
-    # Common patterns for electronics specs
-    patterns = {
-        'storage': r'(\d+)\s*(GB|TB|MB)',
-        'ram': r'(\d+)\s*(GB|MB)\s*RAM',
-        'processor': r'(i\d|ryzen|snapdragon|a\d+|m\d+)[\s\-](\d+)',
-        'screen': r'(\d+\.?\d*)"',
-        'battery': r'(\d+)\s*mAh',
-        'camera': r'(\d+)\s*MP',
-        'condition': r'(new|used|refurbished|like new|excellent|good|fair)',
-        'model_year': r'(20\d\d)'
-    }
-    
-    for key, pattern in patterns.items():
-        match = re.search(pattern, specs_text, re.IGNORECASE)
+    for key, pattern in SPEC_PATTERNS.items():
+        match = pattern.search(specs_text)
         if match:
             specs[key] = match.group(0).strip()
                 
@@ -0,0 +1,235 @@
+"""
+SQLite price history kept across crawls.
+"""
+import os
+import sqlite3
+import logging
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    website TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT,
+    normalized_name TEXT,
+    canonical_id INTEGER,
+    category TEXT,
+    image_url TEXT,
+    currency TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_price REAL,
+    last_price_zar REAL,
+    last_changed TEXT,
+    UNIQUE (website, url)
+);
+CREATE TABLE IF NOT EXISTS price_observations (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    price REAL,
+    price_zar REAL,
+    currency TEXT,
+    observed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_normalized_name ON products (normalized_name);
+CREATE INDEX IF NOT EXISTS idx_products_canonical_id ON products (canonical_id);
+CREATE INDEX IF NOT EXISTS idx_products_website_seen ON products (website, last_seen);
+CREATE INDEX IF NOT EXISTS idx_observations_product_time ON price_observations (product_id, observed_at);
+CREATE INDEX IF NOT EXISTS idx_observations_time ON price_observations (observed_at);
+"""
+
+# Product details are refreshed on every sighting; the price columns only when it changes
+_UPSERT_PRODUCT = """
+INSERT INTO products (website, url, name, normalized_name, canonical_id, category, image_url, currency,
+                      first_seen, last_seen)
+VALUES (:website, :url, :name, :normalized_name, :canonical_id, :category, :image_url, :currency,
+        :timestamp, :timestamp)
+ON CONFLICT (website, url) DO UPDATE SET
+    name = excluded.name,
+    normalized_name = excluded.normalized_name,
+    canonical_id = COALESCE(excluded.canonical_id, canonical_id),
+    category = COALESCE(excluded.category, category),
+    image_url = COALESCE(excluded.image_url, image_url),
+    currency = excluded.currency,
+    last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+# Runs before the products are updated, so it compares with the previous price
+_INSERT_CHANGED_OBSERVATION = """
+INSERT INTO price_observations (product_id, price, price_zar, currency, observed_at)
+SELECT id, :price, :price_zar, :currency, :timestamp FROM products
+WHERE website = :website AND url = :url AND last_price IS NOT :price
+"""
+
+_UPDATE_LAST_PRICE = """
+UPDATE products SET last_price = :price, last_price_zar = :price_zar, last_changed = :timestamp
+WHERE website = :website AND url = :url AND last_price IS NOT :price
+"""
+
+_PRODUCT_COLUMNS = ('website', 'url', 'name', 'normalized_name', 'canonical_id', 'category', 'image_url',
+                    'currency', 'last_price', 'last_price_zar', 'last_changed', 'last_seen')
+
+
+class PriceHistoryStore:
+    """
+    Products keyed by (website, url) with an append-only price history.
+
+    A product gets a new observation only when its price differs from the
+    last one recorded, so repeated crawls of unchanged listings cost a
+    single indexed lookup per item. Batches are written in one
+    transaction with executemany, in WAL mode so queries can run while a
+    crawl is writing.
+
+    Args:
+        path (str): SQLite database file, created if missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self._migrate()
+        self.db.executescript(SCHEMA)
+        self.logger = logging.getLogger(__name__)
+
+    def _migrate(self):
+        """Add columns introduced after a database was created"""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(products)")}
+        if columns and 'canonical_id' not in columns:
+            self.db.execute("ALTER TABLE products ADD COLUMN canonical_id INTEGER")
+
+    @staticmethod
+    def _row(item):
+        """Bind parameters for one item"""
+        return {
+            'website': item.get('website') or '',
+            'url': item.get('url'),
+            'name': item.get('name'),
+            'normalized_name': item.get('normalized_name'),
+            'canonical_id': item.get('canonical_id'),
+            'category': item.get('category'),
+            'image_url': item.get('image_url'),
+            'currency': item.get('currency'),
+            'price': item.get('price'),
+            'price_zar': item.get('price_zar'),
+            'timestamp': item.get('timestamp') or datetime.now().isoformat(),
+        }
+
+    def write_batch(self, items):
+        """
+        Upsert a batch of processed items in a single transaction.
+
+        Items without a URL or price are skipped.
+
+        Returns:
+            int: Number of price changes recorded
+        """
+        rows = [self._row(item) for item in items if item.get('url') and item.get('price') is not None]
+        if not rows:
+            return 0
+
+        with self.db:
+            self.db.executemany(_UPSERT_PRODUCT, rows)
+            changes = self.db.executemany(_INSERT_CHANGED_OBSERVATION, rows).rowcount
+            self.db.executemany(_UPDATE_LAST_PRICE, rows)
+        return changes
+
+    def close(self):
+        self.db.close()
+
+    def latest_prices(self, normalized_name=None, website=None, limit=None, canonical_id=None):
+        """
+        Latest known price per product.
+
+        Args:
+            normalized_name (str): Only products with this normalized name
+            website (str): Only products from this website
+            limit (int): Maximum number of products, most recently seen first
+            canonical_id (int): Only listings of this canonical product
+
+        Returns:
+            list: Dicts with product details and last_price/last_price_zar
+        """
+        query = f"SELECT {', '.join(_PRODUCT_COLUMNS)} FROM products"
+        conditions, params = [], []
+        if normalized_name is not None:
+            conditions.append("normalized_name = ?")
+            params.append(normalized_name)
+        if website is not None:
+            conditions.append("website = ?")
+            params.append(website)
+        if canonical_id is not None:
+            conditions.append("canonical_id = ?")
+            params.append(canonical_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY last_seen DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.db.execute(query, params)]
+
+    def product_history(self, website, url, since=None):
+        """
+        Price changes of one listing, oldest first.
+
+        Args:
+            website (str): Website of the listing
+            url (str): Listing URL
+            since (str): Only observations at or after this ISO timestamp
+
+        Returns:
+            list: Dicts with price, price_zar, currency and observed_at
+        """
+        query = """
+            SELECT o.price, o.price_zar, o.currency, o.observed_at
+            FROM products p JOIN price_observations o ON o.product_id = p.id
+            WHERE p.website = ? AND p.url = ? AND o.observed_at >= ?
+            ORDER BY o.observed_at
+        """
+        return [dict(row) for row in self.db.execute(query, (website, url, since or ''))]
+
+    def history(self, normalized_name, since=None):
+        """
+        Price changes of every listing of a product across websites, oldest first.
+
+        Args:
+            normalized_name (str): Normalized product name
+            since (str): Only observations at or after this ISO timestamp
+
+        Returns:
+            list: Dicts with website, url, price, price_zar, currency and observed_at
+        """
+        query = """
+            SELECT p.website, p.url, o.price, o.price_zar, o.currency, o.observed_at
+            FROM products p JOIN price_observations o ON o.product_id = p.id
+            WHERE p.normalized_name = ? AND o.observed_at >= ?
+            ORDER BY o.observed_at
+        """
+        return [dict(row) for row in self.db.execute(query, (normalized_name, since or ''))]
+
+    def canonical_history(self, canonical_id, since=None):
+        """
+        Price changes of every listing of a canonical product, oldest first.
+
+        Args:
+            canonical_id (int): Canonical product id from the catalog
+            since (str): Only observations at or after this ISO timestamp
+
+        Returns:
+            list: Dicts with website, url, price, price_zar, currency and observed_at
+        """
+        query = """
+            SELECT p.website, p.url, o.price, o.price_zar, o.currency, o.observed_at
+            FROM products p JOIN price_observations o ON o.product_id = p.id
+            WHERE p.canonical_id = ? AND o.observed_at >= ?
+            ORDER BY o.observed_at
+        """
+        return [dict(row) for row in self.db.execute(query, (canonical_id, since or ''))]
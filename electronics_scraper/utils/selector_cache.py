@@ -0,0 +1,121 @@
+"""
+Selector resolution with precompiled candidates and a learned preference order.
+"""
+import os
+import json
+import logging
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from lxml import etree
+from parsel.csstranslator import css2xpath
+
+
+@lru_cache(maxsize=None)
+def compile_selector(css):
+    """
+    Translate a CSS selector (with ::text/::attr() support) to a compiled XPath.
+
+    Compiled once per selector string and shared by every spider using it.
+    """
+    return etree.XPath(css2xpath(css), smart_strings=False)
+
+
+def _to_text(value):
+    """Match parsel's get() output for text, attribute and element results"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, etree._Element):
+        return etree.tostring(value, encoding='unicode', method='html', with_tail=False)
+    return str(value)
+
+
+class SelectorResolver:
+    """
+    Resolve named fields from ordered lists of candidate CSS selectors.
+
+    The candidate that matched last for a field on a domain is tried first
+    on the next page, so most pages cost one selector evaluation per field.
+    Winners can be persisted to a JSON file between runs, and hits (first
+    try matched) and misses (fallbacks were needed) are counted in stats.
+    """
+
+    def __init__(self, fields, cache_file=None, stats=None):
+        """
+        Args:
+            fields (dict): Field name -> ordered list of candidate CSS selectors
+            cache_file (str): JSON file to load and save winning selectors
+            stats (StatsCollector): Crawl stats to count hits and misses in
+        """
+        self.fields = {name: list(candidates) for name, candidates in fields.items()}
+        for candidates in self.fields.values():
+            for css in candidates:
+                compile_selector(css)
+        self.cache_file = cache_file
+        self.stats = stats
+        self.winners = {}  # Domain -> {field: winning selector}
+        self.logger = logging.getLogger(__name__)
+        self.load()
+
+    def load(self):
+        """Load winning selectors saved by a previous run"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                self.winners = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load selector cache {self.cache_file}: {e}")
+            self.winners = {}
+
+    def save(self):
+        """Persist winning selectors"""
+        if not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(self.winners, f, indent=2, sort_keys=True)
+
+    def _inc(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(key)
+
+    def _ordered(self, domain, field):
+        """Candidates for a field with the last winner first"""
+        candidates = self.fields[field]
+        winner = self.winners.get(domain, {}).get(field)
+        if winner in candidates and candidates[0] != winner:
+            return [winner] + [css for css in candidates if css != winner]
+        return candidates
+
+    def getall(self, response, field):
+        """
+        Return every value of the first candidate that matches.
+
+        Args:
+            response (Response): An HTML response
+            field (str): Field name
+
+        Returns:
+            list: Extracted strings, empty if no candidate matched
+        """
+        root = response.selector.root
+        domain = urlsplit(response.url).hostname or ''
+
+        for attempt, css in enumerate(self._ordered(domain, field)):
+            values = compile_selector(css)(root)
+            if values:
+                self._inc('selectors/hit' if attempt == 0 else 'selectors/miss')
+                if attempt:
+                    self.logger.debug(f"Selector for {field} on {domain} is now {css!r}")
+                    self.winners.setdefault(domain, {})[field] = css
+                return [_to_text(value) for value in values]
+
+        self._inc('selectors/miss')
+        self._inc(f'selectors/not_found/{field}')
+        return []
+
+    def get(self, response, field, default=None):
+        """Return the first value of the first candidate that matches, or ``default``"""
+        values = self.getall(response, field)
+        return values[0] if values else default
@@ -0,0 +1,148 @@
+"""
+Incremental on-disk sinks for processed items.
+"""
+import os
+import json
+import logging
+
+# Columns written to columnar sinks, in order
+ITEM_COLUMNS = {
+    'name': 'string',
+    'price': 'float64',
+    'currency': 'string',
+    'specs': 'string',
+    'url': 'string',
+    'website': 'string',
+    'category': 'string',
+    'image_url': 'string',
+    'timestamp': 'string',
+    'normalized_name': 'string',
+    'price_zar': 'float64',
+    'canonical_id': 'int64',
+}
+
+
+class JsonLinesSink:
+    """
+    Append-only JSON lines writer, one line per item.
+    """
+
+    extension = 'jsonl'
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write_batch(self, rows):
+        """Append a batch of item dicts and flush them to disk."""
+        self._file.writelines(
+            json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows
+        )
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def read_frame(self):
+        """Read everything written so far back into a DataFrame."""
+        import pandas as pd
+
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return pd.DataFrame(columns=list(ITEM_COLUMNS))
+        return pd.read_json(self.path, lines=True, dtype=False)
+
+
+class ParquetSink:
+    """
+    Parquet writer that appends one row group per batch.
+
+    Requires pyarrow. Nested values such as ``specs`` are stored as JSON
+    strings so every batch shares the same schema.
+    """
+
+    extension = 'parquet'
+
+    def __init__(self, path, columns=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.columns = columns or ITEM_COLUMNS
+        self.schema = pa.schema([(name, pa.type_for_alias(dtype)) for name, dtype in self.columns.items()])
+        self._pa = pa
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def _column(self, rows, name):
+        values = [row.get(name) for row in rows]
+        if self.columns[name] == 'string':
+            values = [
+                value if value is None or isinstance(value, str)
+                else json.dumps(value, ensure_ascii=False, default=str)
+                for value in values
+            ]
+        return values
+
+    def write_batch(self, rows):
+        """Write a batch of item dicts as a single row group."""
+        table = self._pa.table(
+            {name: self._column(rows, name) for name in self.columns},
+            schema=self.schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+    def read_frame(self):
+        """Read the file back into a DataFrame (the writer must be closed)."""
+        import pyarrow.parquet as pq
+
+        return pq.read_table(self.path).to_pandas()
+
+
+SINK_CLASSES = {
+    'jsonl': JsonLinesSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sinks(base_path, names):
+    """
+    Open the named sinks, skipping any whose dependencies are missing.
+
+    Args:
+        base_path (str): Output path without extension
+        names (list): Sink names from SINK_CLASSES
+
+    Returns:
+        list: Opened sink instances
+    """
+    sinks = []
+    for name in names:
+        sink_class = SINK_CLASSES[name]
+        try:
+            sinks.append(sink_class(f"{base_path}.{sink_class.extension}"))
+        except ImportError as e:
+            logging.getLogger(__name__).warning(f"Skipping {name} sink: {e}")
+    return sinks
+
+
+def read_results(base_path):
+    """
+    Read the items written under ``base_path`` by open_sinks' sinks.
+
+    The Parquet file is preferred when present, as it keeps column types.
+
+    Returns:
+        DataFrame: The items, empty if nothing was written
+    """
+    import pandas as pd
+
+    if os.path.exists(f"{base_path}.{ParquetSink.extension}"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(f"{base_path}.{ParquetSink.extension}").to_pandas()
+    jsonl_path = f"{base_path}.{JsonLinesSink.extension}"
+    if os.path.exists(jsonl_path) and os.path.getsize(jsonl_path):
+        return pd.read_json(jsonl_path, lines=True, dtype=False)
+    return pd.DataFrame(columns=list(ITEM_COLUMNS))
@@ -5,18 +5,14 @@ Main script to run the electronics price comparison system.
 import os
 import sys
 import logging
+import argparse
 from datetime import datetime
-from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
 # Ensure the project's directory is in the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from electronics_scraper.spiders.bobshop_spider import BobShopSpider
-from electronics_scraper.spiders.revibe_spider import RevibeSpider
-from electronics_scraper.spiders.istore_spider import IStorePreOwnedSpider
-from electronics_scraper.spiders.gorilla_spider import GorillaPhoneSpider
-from electronics_scraper.spiders.backmarket_spider import BackMarketSpider
+from electronics_scraper.runner import CrawlRunner, parse_shards
 
 
 def setup_logging():
@@ -34,8 +30,16 @@ def setup_logging():
     )
 
 
-def run_spiders():
-    """Run all spiders to collect and process electronics data"""
+def run_spiders(workers=None, only=None, timeout=None, shards=None):
+    """
+    Run the spiders in parallel worker processes and process the merged results.
+
+    Args:
+        workers (int): Maximum concurrent worker processes (default: one per job)
+        only (list): Names of the spiders to run (default: all)
+        timeout (int): Per-spider crawl time limit in seconds
+        shards (dict): Spider name -> number of processes splitting its start URLs
+    """
     # Ensure directories exist
     os.makedirs('results', exist_ok=True)
     
@@ -44,31 +48,48 @@ def run_spiders():
     
     logging.info("Starting electronics price comparison crawler...")
     
-    # Get project settings
-    settings = get_project_settings()
-    
-    # Initialize crawler process
-    process = CrawlerProcess(settings)
-    
-    # Register spiders to crawl
-    spiders = [
-        BobShopSpider,
-        RevibeSpider,
-        IStorePreOwnedSpider,
-        GorillaPhoneSpider,
-        BackMarketSpider
-    ]
+    runner = CrawlRunner(get_project_settings(), workers=workers, timeout=timeout)
+    summary = runner.crawl(only, shards)
     
-    for spider_class in spiders:
-        logging.info(f"Adding spider: {spider_class.name}")
-        process.crawl(spider_class)
-    
-    # Start crawling
-    logging.info("Starting crawl process")
-    process.start()
-    
-    logging.info("Crawling completed. Check the 'results' directory for opportunities.")
+    for key, report in summary['jobs'].items():
+        logging.info(f"  {key:<24} {report.get('status', 'unknown'):<9} {report.get('elapsed', 0):>7.0f}s "
+                     f"{report['stats'].get('item_scraped_count', 0):>7} items")
+    logging.info(f"Crawling completed. Check {runner.run_dir} for opportunities.")
+
+
+def compact_catalog():
+    """Refit and re-cluster the canonical product catalog (run periodically, outside crawls)"""
+    from electronics_scraper.utils.matcher import CanonicalCatalog
+
+    setup_logging()
+    settings = get_project_settings()
+    catalog_dir = settings.get('CANONICAL_CATALOG_DIR')
+    if not catalog_dir:
+        logging.error("CANONICAL_CATALOG_DIR is not set")
+        return
+
+    catalog = CanonicalCatalog(catalog_dir, settings.getfloat('CANONICAL_MATCH_THRESHOLD', 0.7))
+    before = len(catalog)
+    merged = catalog.compact()
+    catalog.save()
+    logging.info(f"Compacted catalog {catalog_dir}: {before} canonicals, {merged} merged, {len(catalog)} left")
 
 
 if __name__ == "__main__":
-    run_spiders()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Electronics price comparison crawler")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Maximum worker processes (default: one per spider or shard)")
+    parser.add_argument('--only', type=lambda value: [name.strip() for name in value.split(',') if name.strip()],
+                        default=None, help="Comma-separated spiders to run, e.g. bobshop,revibe")
+    parser.add_argument('--timeout', type=int, default=None,
+                        help="Per-spider time limit in seconds")
+    parser.add_argument('--shards', type=parse_shards, default=None,
+                        help="Split spiders' start URLs across processes, e.g. bobshop=3,backmarket=2")
+    parser.add_argument('--compact-catalog', action='store_true',
+                        help="Compact the canonical product catalog instead of crawling")
+    args = parser.parse_args()
+
+    if args.compact_catalog:
+        compact_catalog()
+    else:
+        run_spiders(workers=args.workers, only=args.only, timeout=args.timeout, shards=args.shards)